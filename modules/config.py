@@ -27,7 +27,8 @@ HALLUCINATION_SILENCE_THRESHOLD = 0.9   # Discard if >90% no-speech prob
 HALLUCINATION_REPETITION_THRESHOLD = 15  # Flag if same segment repeats 15+ times
 
 # Known hallucination phrases that Whisper outputs on unintelligible audio
-HALLUCINATION_PHRASES = [
+# (lowercase to match the filter's lowercased text; _load_hallucination_config lowercases user phrases too)
+HALLUCINATION_PHRASES = frozenset([
     # Romanian
     "nu uitați să dați like", "nu uitati sa dati like",
     "să lăsați un comentariu", "sa lasati un comentariu",
@@ -59,7 +60,7 @@ HALLUCINATION_PHRASES = [
     "gracias por ver", "no olvides suscribirte",
     # Italian
     "grazie per aver guardato", "non dimenticare di iscriverti",
-]
+])
 
 VIDEO_EXTENSIONS = {
     ".mp4", ".mkv", ".mov", ".avi", ".webm", ".flv", ".m4v", ".ts", ".mts"
@@ -181,7 +182,7 @@ def _load_hallucination_config(h_conf, logger_func):
     if "repetition_threshold" in h_conf:
         HALLUCINATION_REPETITION_THRESHOLD = int(h_conf["repetition_threshold"])
     if "known_phrases" in h_conf and isinstance(h_conf["known_phrases"], list):
-        HALLUCINATION_PHRASES = h_conf["known_phrases"]
+        HALLUCINATION_PHRASES = frozenset(str(p).lower() for p in h_conf["known_phrases"])
     logger_func(
         f"[Config] Loaded Hallucination Filters "
         f"(Silence: {HALLUCINATION_SILENCE_THRESHOLD}, "
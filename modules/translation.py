@@ -38,7 +38,7 @@ def _handle_pivot_pass(source_data, src_lang, folder, base_name, missing_langs,
 
     try:
         # SAFETY: Popen for cleanup
-        proc = subprocess.Popen(cmd)
+        proc = subprocess.Popen(cmd, **utils.process_group_kwargs())
         utils.register_subprocess(proc)
         proc.wait()
 
@@ -250,7 +250,7 @@ def _run_worker_process(manifest_path, missing_langs, folder, base_name, segment
         manifest_path
     ]
 
-    proc = subprocess.Popen(cmd)
+    proc = subprocess.Popen(cmd, **utils.process_group_kwargs())
     utils.register_subprocess(proc)
 
     try:
@@ -6,6 +6,7 @@ import sys
 import time
 import math
 import os
+import re
 import signal
 import subprocess
 from . import config
@@ -81,6 +82,19 @@ def print_banner(optimizer=None):
 # Track active subprocesses for cleanup
 active_subprocesses = []
 
+# Seconds handle_shutdown waits after SIGTERM before SIGKILLing a process group (POSIX)
+SHUTDOWN_GRACE_SECONDS = 2.0
+
+
+def process_group_kwargs(creationflags=0):
+    """Popen kwargs that start the child as the leader of its own process group.
+
+    handle_shutdown can then signal the child and any grandchildren it spawned in one call.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": creationflags | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"creationflags": creationflags, "start_new_session": True}
+
 
 def register_subprocess(proc):
     """Registers a subprocess to be killed on shutdown."""
@@ -93,26 +107,66 @@ def unregister_subprocess(proc):
         active_subprocesses.remove(proc)
 
 
-def handle_shutdown(signum, frame):
-    """Handles termination signals for graceful shutdown."""
-    print("\n\n[!] Termination detected. Stopping all processes...")
+def _signal_process_group(proc, sig):
+    """Signals the group led by proc; falls back to proc alone if it has no group of its own."""
+    try:
+        os.killpg(proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        if sig == signal.SIGTERM:
+            proc.terminate()
+        else:
+            proc.kill()
+
 
-    # Kill all registered subprocesses
-    for proc in active_subprocesses:
-        if proc.poll() is None:  # If running
+def _kill_process_groups(running, grace):
+    """SIGTERMs every group, waits up to `grace` seconds, then SIGKILLs the survivors."""
+    for proc in running:
+        try:
+            print(f"  [Cleanup] Killing subprocess PID: {proc.pid}")
+            _signal_process_group(proc, signal.SIGTERM)
+        except Exception as e:
+            print(f"  [Cleanup] Error killing process: {e}")
+
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline and any(proc.poll() is None for proc in running):
+        time.sleep(0.1)
+
+    for proc in running:
+        if proc.poll() is None:
             try:
-                print(f"  [Cleanup] Killing subprocess PID: {proc.pid}")
-                proc.terminate()
-                # Windows might need force kill if SIGTERM is ignored
-                if sys.platform == "win32":
-                    subprocess.call(
-                        ['taskkill', '/F', '/T', '/PID', str(proc.pid)],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL
-                    )
+                _signal_process_group(proc, signal.SIGKILL)
             except Exception as e:
                 print(f"  [Cleanup] Error killing process: {e}")
 
+
+def _taskkill_trees(running):
+    """Force-kills every process tree with a single taskkill call (Windows)."""
+    pids = [str(proc.pid) for proc in running]
+    print(f"  [Cleanup] Killing subprocess PIDs: {', '.join(pids)}")
+    cmd = ['taskkill', '/F', '/T']
+    for pid in pids:
+        cmd.extend(['/PID', pid])
+    try:
+        subprocess.call(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        print(f"  [Cleanup] Error killing process: {e}")
+
+
+def handle_shutdown(signum, frame, procs=None, grace=None):
+    """Handles termination signals for graceful shutdown.
+
+    `procs` defaults to the registered active_subprocesses and `grace` to SHUTDOWN_GRACE_SECONDS.
+    """
+    print("\n\n[!] Termination detected. Stopping all processes...")
+
+    # Kill all registered subprocesses (and their children) that are still running
+    running = [proc for proc in (procs if procs is not None else active_subprocesses) if proc.poll() is None]
+    if running:
+        if sys.platform == "win32":
+            _taskkill_trees(running)
+        else:
+            _kill_process_groups(running, SHUTDOWN_GRACE_SECONDS if grace is None else grace)
+
     sys.exit(0)
 
 
@@ -329,61 +383,54 @@ def format_timestamp(seconds):
     )
 
 
+# HH:MM:SS with optional ,mmm (SRT) or .mmm (FFmpeg) milliseconds
+_TIMESTAMP_RE = re.compile(r"(\d+):(\d+):(\d+)(?:[,.](\d+))?")
+
+
 def parse_timestamp(ts_str):
     """Converts SRT timestamp (HH:MM:SS,mmm) to seconds."""
-    try:
-        if ':' not in ts_str:
-            return 0.0
-        h, m, s_ms = ts_str.split(':')
-        if ',' in s_ms:
-            s, ms = s_ms.split(',')
-        elif '.' in s_ms:
-            s, ms = s_ms.split('.')
-        else:
-            s, ms = s_ms, "0"
-        return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
-    except Exception:
+    match = _TIMESTAMP_RE.fullmatch(ts_str.strip()) if isinstance(ts_str, str) else None
+    if not match:
         return 0.0
+    h, m, s, ms = match.groups(default="0")
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
 
 
 def _process_ffmpeg_line(line, start_time, total_duration, desc):
-    """Helper to parse progress line from FFmpeg."""
-    if line and "time=" in line:
-        try:
-            time_str = line.split("time=")[1].split()[0]
-            current_seconds = parse_timestamp(
-                time_str.replace('.', ',')
+    """Helper to parse one `-progress` key=value line from FFmpeg."""
+    key, _, value = line.strip().partition("=")
+    # out_time_us is "N/A" until the first frame is muxed
+    if key != "out_time_us" or not value.isdigit():
+        return
+    try:
+        current_seconds = int(value) / 1e6
+        if total_duration > 0:
+            elapsed = time.time() - start_time
+            speed = current_seconds / elapsed if elapsed > 0 else 0
+            eta = (
+                (total_duration - current_seconds) / speed
+                if speed > 0 else 0
             )
-            if total_duration > 0:
-                elapsed = time.time() - start_time
-                speed = current_seconds / elapsed if elapsed > 0 else 0
-                eta = (
-                    (total_duration - current_seconds) / speed
-                    if speed > 0 else 0
-                )
-
-                print_progress_bar(
-                    current_seconds, total_duration,
-                    prefix=desc,
-                    elapsed=elapsed,
-                    speed=speed,
-                    eta=eta
-                )
-        except Exception:
-            # GC/Cache clear
-            import gc
-            gc.collect()
-            pass
 
+            print_progress_bar(
+                current_seconds, total_duration,
+                prefix=desc,
+                elapsed=elapsed,
+                speed=speed,
+                eta=eta
+            )
+    except Exception:
+        # GC/Cache clear
+        import gc
+        gc.collect()
+        pass
 
-def _monitor_ffmpeg_process(process, start_time, total_duration, desc):
-    """Monitors FFmpeg stderr for progress updates."""
-    while True:
-        line = process.stderr.readline()
-        if not line and process.poll() is not None:
-            break
 
+def _monitor_ffmpeg_process(process, start_time, total_duration, desc):
+    """Monitors FFmpeg's `-progress pipe:1` stream until it closes."""
+    for line in iter(process.stdout.readline, ""):
         _process_ffmpeg_line(line, start_time, total_duration, desc)
+    process.wait()
 
 
 def _finalize_ffmpeg_progress(process, cmd, start_time, total_duration, desc):
@@ -406,12 +453,13 @@ def run_ffmpeg_progress(cmd, desc, total_duration):
     """Executes FFmpeg command with a real-time progress bar UI."""
     try:
         start_time = time.time()
-        # Popen to capture progress
+        # Machine-readable key=value progress on stdout instead of scraping the stderr stats line
+        progress_cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
         process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            creationflags=(
+            progress_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            **process_group_kwargs(
                 subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
             ),
             encoding="utf-8",
@@ -528,11 +576,13 @@ def save_srt(segments, path):
 
     temp_path = path + ".tmp"
     try:
+        # Build the whole payload first so the file sees a single write
+        payload = "".join(
+            f"{i}\n{format_timestamp(seg.start)} --> {format_timestamp(seg.end)}\n{seg.text}\n\n"
+            for i, seg in enumerate(segments, 1)
+        )
         with open(temp_path, "w", encoding="utf-8") as f:
-            for i, seg in enumerate(segments, 1):
-                start = format_timestamp(seg.start)
-                end = format_timestamp(seg.end)
-                f.write(f"{i}\n{start} --> {end}\n{seg.text}\n\n")
+            f.write(payload)
 
         # Atomic replace (handles overwrite on Windows Python 3.3+)
         os.replace(temp_path, path)
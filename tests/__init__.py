@@ -0,0 +1,2 @@
+# Marks tests/ as a package so test modules can share helpers via `from tests.fakes import ...`.
+# The suite runs under pytest only; conftest.py handles the path bootstrap and library stand-ins.
@@ -1,6 +1,13 @@
+import pathlib
 import sys
-import os
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, create_autospec
+
+import pytest
+
+# Make the project root importable once per session; test files rely on this
+_root = str(pathlib.Path(__file__).resolve().parents[1])
+if _root not in sys.path:
+    sys.path.insert(0, _root)
 
 torch_mock = MagicMock()
 torch_mock.__version__ = "2.0.1"
@@ -29,7 +36,7 @@ sys.modules["fastdtw"] = MagicMock()
 m_sub = MagicMock()
 m_sub.Popen.return_value.wait.return_value = 0
 m_sub.Popen.return_value.returncode = 0
-m_sub.Popen.return_value.stderr.readline.return_value = ""
+m_sub.Popen.return_value.stdout.readline.return_value = ""
 m_sub.Popen.return_value.poll.return_value = 0
 m_sub.Popen.return_value.communicate.return_value = (b"", b"")
 sys.modules["subprocess"] = m_sub
@@ -50,7 +57,9 @@ if sys.platform != "win32":
     if not hasattr(ctypes, "windll"):
         ctypes.windll = MagicMock()
 
-# Standard pytest hook to fix sys.path
-_p = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _p not in sys.path:
-    sys.path.insert(0, _p)
+
+@pytest.fixture(scope="session")
+def model_manager_mock():
+    """One ModelManager instance double, autospecced once per session; tests reset it before use."""
+    from modules.models import ModelManager
+    return create_autospec(ModelManager, instance=True)
@@ -0,0 +1,85 @@
+import copy
+from unittest.mock import patch
+
+
+class FakeFS:
+    """Set-backed stand-in for the os / os.path probes used by the pipeline.
+
+    Every method is a plain function (no MagicMock), and install() swaps all of
+    them in on a single ExitStack.
+    """
+
+    def __init__(self, files=(), dirs=(), walk=None, listing=()):
+        self.files = set(files)
+        self.dirs = set(dirs)
+        self._walk = list(walk or [])
+        self._listing = tuple(listing)
+
+    def exists(self, path):
+        return path in self.files or path in self.dirs
+
+    def isfile(self, path):
+        return path in self.files
+
+    def isdir(self, path):
+        return path in self.dirs
+
+    def listdir(self, path="."):
+        return self._listing
+
+    def walk(self, top, *args, **kwargs):
+        return iter(self._walk)
+
+    def remove(self, path):
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        self.files.discard(path)
+
+    def rename(self, src, dst):
+        self.remove(src)
+        self.files.add(dst)
+
+    def install(self, stack):
+        """Patches os / os.path with this filesystem for the lifetime of `stack`."""
+        for target, func in (
+            ("os.path.exists", self.exists),
+            ("os.path.isfile", self.isfile),
+            ("os.path.isdir", self.isdir),
+            ("os.listdir", self.listdir),
+            ("os.walk", self.walk),
+            ("os.remove", self.remove),
+            ("os.rename", self.rename),
+        ):
+            stack.enter_context(patch(target, func))
+        return self
+
+
+class SwapMixin:
+    """TestCase mixin for patch-free attribute swaps."""
+
+    def _swap(self, obj, attr, new):
+        """Sets obj.attr to `new` for the rest of the test and returns `new`; addCleanup restores it."""
+        self.addCleanup(setattr, obj, attr, getattr(obj, attr))
+        setattr(obj, attr, new)
+        return new
+
+
+def snapshot_config(module):
+    """Copies a config module's uppercase globals so tests can put them back afterwards."""
+    return {k: copy.copy(v) for k, v in vars(module).items() if k.isupper()}
+
+
+def restore_config(module, snapshot):
+    """Rebinds the globals captured by snapshot_config(), copying again so the snapshot stays reusable."""
+    for k, v in snapshot.items():
+        setattr(module, k, copy.copy(v))
+
+
+def log_calls(m):
+    """(args, sorted kwargs items) for every call made to a mocked log, in call order."""
+    return [(c.args, tuple(sorted(c.kwargs.items()))) for c in m.call_args_list]
+
+
+# Attribute whitelists for spec= on subprocess / NLLB translator doubles; a typo'd attribute raises
+PROC_SPEC = ["poll", "wait", "terminate", "kill", "returncode", "pid", "stdout"]
+TRANSLATOR_SPEC = ["translate"]
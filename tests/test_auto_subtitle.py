@@ -1,18 +1,56 @@
 import os
+import re
 import sys
-import argparse
 import unittest
 import unittest.mock
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch, mock_open
 
-# Ensure modules can be imported relative to the test file
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+# Paths that mock_exists reports as present: videos and separated vocal tracks
+_EXISTS_RE = re.compile(r"\.mp4$|[Vv]ocal")
+
+# Fixed attribute sets for hot mocks so lookups never auto-create child mocks
+_PROC_ATTRS = ["wait", "poll", "returncode", "pid", "stdout", "stderr", "communicate", "terminate", "kill"]
+_WHISPER_ATTRS = ["transcribe"]
+
+# Shared, read-only TARGET_LANGUAGES fixtures for patch.dict
+_TGT_ES = MappingProxyType({"es": {"code": "spa", "label": "Esp"}})
+_TGT_ES_FR = MappingProxyType({
+    "es": {"code": "spa_Latn", "label": "Esp"},
+    "fr": {"code": "fra_Latn", "label": "Fra"}
+})
+
+# NVIDIA wheel layout seen by test_nvidia_path_loading; plain functions skip mock bookkeeping
+_LISTING = ("cudnn", "cublas")
+
+
+def _listdir(_):
+    return _LISTING
+
+
+def _nvidia_exists(path):
+    return "nvidia" in path or "site-packages" in path or "lib" in path
 
 
 class TestAutoSubtitleUltimate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One Popen stub for the whole class; tests override return codes in-body
+        cls._popen_patcher = patch("subprocess.Popen")
+        cls.m_popen = cls._popen_patcher.start()
+        cls.m_popen.return_value = MagicMock(spec_set=_PROC_ATTRS)
+        cls.addClassCleanup(cls._popen_patcher.stop)
+
     def setUp(self):
+        # Restore the happy-path process defaults (mirrors conftest.py)
+        self.m_popen.reset_mock()
+        proc = self.m_popen.return_value
+        proc.wait.return_value = 0
+        proc.returncode = 0
+        proc.poll.return_value = 0
+        proc.stdout.readline.return_value = ""
+        proc.communicate.return_value = (b"", b"")
+
         # Lazy import to ensure coverage measurement
         global auto_subtitle, config, models, translation
         import auto_subtitle
@@ -31,11 +69,8 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
         models.OPTIMIZER.config["nllb_batch"] = 8
 
     def mock_exists(self, path):
-        # Mock logic to distinguish between video files and
-        p = str(path)
-        if p.endswith(".mp4") or "Vocals" in p or "vocal" in p:
-            return True
-        return False
+        # Mock logic to distinguish between video files and vocal stems
+        return bool(_EXISTS_RE.search(str(path)))
 
     def test_verify_mocks(self):
         # Diagnostic: Ensure we are NOT using real libraries
@@ -59,28 +94,45 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
         self.assertIsNotNone(modules.translation)
         auto_subtitle.log("  [Diagnostic] All AI mocks and modules verified.")
 
-    def test_get_input_files_single_video(self):
-        with patch("os.path.isfile", return_value=True), \
-                patch("os.path.isdir", return_value=False), \
-                patch("sys.argv", ["utils.py", "test.mp4"]):
-            files, _, _ = auto_subtitle.get_input_files()
-            self.assertEqual(files, [os.path.abspath("test.mp4")])
-
-    def test_get_input_files_directory(self):
-        with patch("os.path.isdir", return_value=True), \
-                patch("os.walk", return_value=[("input_dir", [], ["vid1.mp4", "vid2.mkv", "readme.txt"])]), \
-                patch("sys.argv", ["utils.py", "input_dir"]):
-            with patch("os.path.isfile",
-                       side_effect=lambda x: x.endswith(".mp4") or x.endswith(".mkv")):
-                files, _, _ = auto_subtitle.get_input_files()
-                self.assertEqual(len(files), 2)
-                self.assertIn(os.path.abspath(os.path.join("input_dir", "vid1.mp4")), files)
+    def _run_get_input_files(self, argv, isfile, isdir, walk=(), user_input=""):
+        # One patch stack shared by every filesystem shape below
+        with patch("sys.argv", argv), \
+                patch("builtins.input", return_value=user_input), \
+                patch("os.path.isfile", side_effect=isfile), \
+                patch("os.path.isdir", return_value=isdir), \
+                patch("os.walk", return_value=list(walk)), \
+                patch.dict(os.environ):
+            return auto_subtitle.get_input_files()
+
+    def test_get_input_files(self):
+        # (name, argv, isfile, isdir, walk, user_input, expected (files, lang, prompt))
+        scenarios = [
+            ("single_file", ["auto_subtitle.py", "test.mp4"],
+             lambda p: True, False, (), "",
+             ([os.path.abspath("test.mp4")], None, None)),
+            ("directory", ["auto_subtitle.py", "input_dir"],
+             lambda p: p.endswith((".mp4", ".mkv")), True,
+             [("input_dir", [], ["vid1.mp4", "vid2.mkv", "readme.txt"])], "",
+             ([os.path.abspath(os.path.join("input_dir", "vid1.mp4")),
+               os.path.abspath(os.path.join("input_dir", "vid2.mkv"))], None, None)),
+            ("directory_with_options",
+             ["auto_subtitle.py", "myfolder", "--lang", "en", "--prompt", "hello"],
+             lambda p: False, True, [("myfolder", [], ["vid.mp4", "ignore.txt"])], "",
+             ([os.path.abspath(os.path.join("myfolder", "vid.mp4"))], "en", "hello")),
+            ("prompt_input", ["auto_subtitle.py", "--cpu"],
+             lambda p: True, False, (), "myvideo.mp4",
+             ([os.path.abspath("myvideo.mp4")], None, None)),
+        ]
+        for name, argv, isfile, isdir, walk, user_input, expected in scenarios:
+            with self.subTest(scenario=name):
+                res = self._run_get_input_files(argv, isfile, isdir, walk, user_input)
+                self.assertEqual(res, expected)
 
     def test_process_video_end_to_end_flow(self):
         # Test the high-level orchestration of process_video
         mock_seg = MagicMock(start=0.0, end=1.0, text="Hello")
         with patch("modules.utils.extract_clean_audio", return_value="temp.wav"):
-            with patch("modules.models.WhisperModel") as m_w:
+            with patch("modules.models.WhisperModel", return_value=MagicMock(spec_set=_WHISPER_ATTRS)) as m_w:
                 m_w.return_value.transcribe.return_value = (
                     [mock_seg],
                     MagicMock(language="en", language_probability=0.99, duration=100.0)
@@ -124,7 +176,7 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
                                       "audio_separator.separator": MagicMock()}):
             sys.modules["audio_separator.separator"].Separator.return_value.separate.return_value = []
             with patch("modules.utils.extract_clean_audio", return_value="temp.wav"):
-                with patch("modules.models.WhisperModel") as m_whisper:
+                with patch("modules.models.WhisperModel", return_value=MagicMock(spec_set=_WHISPER_ATTRS)) as m_whisper:
                     m_whisper.return_value.transcribe.side_effect = Exception("Whisper Crash")
                     with patch("auto_subtitle.log"), \
                             patch("modules.utils.cleanup_temp_files") as m_clean:
@@ -139,92 +191,81 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
     def test_nllb_translation_generic_error_handling(self):
         # Test how _translate_segments handles a failed NLLB translation subprocess
         with patch("modules.utils.extract_clean_audio", return_value="temp.wav"):
-            with patch("modules.models.WhisperModel") as m_w:
+            with patch("modules.models.WhisperModel", return_value=MagicMock(spec_set=_WHISPER_ATTRS)) as m_w:
                 m_w.return_value.transcribe.return_value = (
                     [MagicMock(start=0, end=1, text="test", avg_logprob=-0.1)],
                     MagicMock(language="en", language_probability=0.99, duration=100.0)
                 )
-                with patch("subprocess.Popen") as m_popen:
-                    m_popen.return_value.wait.return_value = 1
-                    m_popen.return_value.returncode = 1
+                self.m_popen.return_value.wait.return_value = 1
+                self.m_popen.return_value.returncode = 1
 
-                    with patch("auto_subtitle.log"), \
-                            patch("modules.translation.log") as m_log_transl, \
-                            patch("modules.utils.cleanup_temp_files"), \
-                            patch("auto_subtitle.embed_subtitles"), \
-                            patch("os.remove"), \
-                            patch("auto_subtitle._check_resume", return_value=(None, None, None)):
-
-                        mock_mgr = MagicMock()
-                        mock_mgr.get_whisper.return_value = m_w.return_value
-                        tgt = {"es": {"code": "spa", "label": "Esp"}}
-                        with patch.dict(config.TARGET_LANGUAGES, tgt, clear=True):
-                            with patch("builtins.open", mock_open(read_data='[]')):
-                                auto_subtitle.process_video(os.path.abspath("trans_fail.mkv"),
-                                                            mock_mgr)
-
-                        logs = [str(c[0][0]) for c in m_log_transl.call_args_list if c.args]
-                        self.assertTrue(any("Translation worker failed" in line for line in logs))
+                with patch("auto_subtitle.log"), \
+                        patch("modules.translation.log") as m_log_transl, \
+                        patch("modules.utils.cleanup_temp_files"), \
+                        patch("auto_subtitle.embed_subtitles"), \
+                        patch("os.remove"), \
+                        patch("auto_subtitle._check_resume", return_value=(None, None, None)):
+
+                    mock_mgr = MagicMock()
+                    mock_mgr.get_whisper.return_value = m_w.return_value
+                    with patch.dict(config.TARGET_LANGUAGES, _TGT_ES, clear=True):
+                        with patch("builtins.open", mock_open(read_data='[]')):
+                            auto_subtitle.process_video(os.path.abspath("trans_fail.mkv"),
+                                                        mock_mgr)
+
+                    logs = [str(c[0][0]) for c in m_log_transl.call_args_list if c.args]
+                    self.assertTrue(any("Translation worker failed" in line for line in logs))
 
     def test_batch_translation_manifest_generation(self):
         # Verify that _execute_translation_workers generates the correct manifest
         with patch("modules.utils.extract_clean_audio", return_value="temp.wav"):
-            with patch("subprocess.Popen") as m_popen:
-                m_popen.return_value.wait.return_value = 0
-                m_popen.return_value.returncode = 0
-
-                with patch("auto_subtitle.log"), \
-                        patch("modules.translation.log"), \
-                        patch("modules.utils.cleanup_temp_files"), \
-                        patch("modules.utils.save_translated_srt"), \
-                        patch("builtins.open", mock_open()) as m_open, \
-                        patch("json.dump") as m_json_dump, \
-                        patch("os.path.exists", side_effect=lambda x: True), \
-                        patch("os.remove"), \
-                        patch("modules.translation.time.sleep"):
-
-                    folder = os.path.abspath("test_folder")
-                    base_name = "video"
-                    src_code = "eng_Latn"
-                    missing_langs = ["es", "fr"]
-                    source_data = [{"text": "Hello", "start": 0, "end": 1}]
-                    segments = []
-
-                    # Mock config targets
-                    targets = {
-                        "es": {"code": "spa_Latn", "label": "Esp"},
-                        "fr": {"code": "fra_Latn", "label": "Fra"}
-                    }
-                    with patch.dict(config.TARGET_LANGUAGES, targets, clear=True):
-                        translation._execute_translation_workers(
-                            missing_langs, source_data, src_code, folder, base_name, segments
-                        )
-
-                    # Verify manifest creation
-                    # We expect json.dump to be called for:
-                    # 1. common_input
-                    # 2. manifest
-                    # We want to check the manifest content
-
-                    # Find the call that dumped the manifest (dict with "jobs")
-                    manifest_call = None
-                    for call in m_json_dump.call_args_list:
-                        args = call[0]
-                        if isinstance(args[0], dict) and "jobs" in args[0]:
-                            manifest_call = args[0]
-                            break
-
-                    self.assertIsNotNone(manifest_call)
-                    self.assertEqual(len(manifest_call["jobs"]), 2)
-                    self.assertEqual(manifest_call["jobs"][0]["lang"], "es")
-                    self.assertEqual(manifest_call["jobs"][1]["lang"], "fr")
-
-                    # proper command called
-                    cmd_args = m_popen.call_args[0][0]
-                    self.assertIn("--batch", cmd_args)
-
-                    # Verify open was called (satisfies lint and logic)
-                    m_open.assert_called()
+            with patch("auto_subtitle.log"), \
+                    patch("modules.translation.log"), \
+                    patch("modules.utils.cleanup_temp_files"), \
+                    patch("modules.utils.save_translated_srt"), \
+                    patch("builtins.open", mock_open()) as m_open, \
+                    patch("json.dump") as m_json_dump, \
+                    patch("modules.translation.os.path.exists", return_value=True), \
+                    patch("os.remove"), \
+                    patch("modules.translation.time.sleep"):
+
+                folder = os.path.abspath("test_folder")
+                base_name = "video"
+                src_code = "eng_Latn"
+                missing_langs = ["es", "fr"]
+                source_data = [{"text": "Hello", "start": 0, "end": 1}]
+                segments = []
+
+                with patch.dict(config.TARGET_LANGUAGES, _TGT_ES_FR, clear=True):
+                    translation._execute_translation_workers(
+                        missing_langs, source_data, src_code, folder, base_name, segments
+                    )
+
+                # Verify manifest creation
+                # We expect json.dump to be called for:
+                # 1. common_input
+                # 2. manifest
+                # We want to check the manifest content
+
+                # Find the call that dumped the manifest (dict with "jobs")
+                manifest_call = None
+                for call in m_json_dump.call_args_list:
+                    args = call[0]
+                    if isinstance(args[0], dict) and "jobs" in args[0]:
+                        manifest_call = args[0]
+                        break
+
+                self.assertIsNotNone(manifest_call)
+                self.assertEqual(len(manifest_call["jobs"]), 2)
+                self.assertEqual(manifest_call["jobs"][0]["lang"], "es")
+                self.assertEqual(manifest_call["jobs"][1]["lang"], "fr")
+
+                # proper command called
+                cmd_args = self.m_popen.call_args[0][0]
+                self.assertIn("--batch", cmd_args)
+
+                # Verify open was called (satisfies lint and logic)
+                m_open.assert_called()
 
     def test_nllb_load_fallback_to_local(self):
         # Verify that NLLBTranslator tries local_files_only=True if network fails
@@ -307,37 +348,6 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
             self.assertEqual(m_proc.call_count, 1)
             m_proc.assert_called()
 
-    @patch("argparse.ArgumentParser.parse_args")
-    @patch("builtins.input", return_value="")
-    @patch("os.path.isdir", return_value=True)
-    @patch("os.path.isfile", return_value=False)
-    @patch("os.walk")
-    def test_get_input_files(self, mock_walk, mock_isfile, mock_isdir, mock_input, mock_args):
-        # Scenario 1: Arg provided, is folder
-        mock_args.return_value = argparse.Namespace(
-            input_path="myfolder", lang="en", prompt="hello", cpu=False
-        )
-        mock_walk.return_value = [("myfolder", [], ["vid.mp4", "ignore.txt"])]
-
-        files, lang, prompt = auto_subtitle.get_input_files()
-
-        self.assertEqual(lang, "en")
-        self.assertEqual(prompt, "hello")
-        self.assertTrue("vid.mp4" in files[0])
-
-        # Scenario 2: No arg, prompt user
-        mock_args.return_value = argparse.Namespace(
-            input_path=None, lang=None, prompt=None, cpu=True
-        )
-        mock_input.return_value = "myvideo.mp4"
-        mock_isdir.return_value = False
-        mock_isfile.return_value = True
-
-        files, lang, prompt = auto_subtitle.get_input_files()
-        self.assertEqual(len(files), 1)
-        self.assertTrue(files[0].endswith("myvideo.mp4"))
-        self.assertIsNone(lang)
-
     def test_embed_subtitles(self):
         # Cover embed_subtitles logic
         with patch("auto_subtitle.utils.run_ffmpeg_progress") as m_run, \
@@ -380,17 +390,11 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
     def test_nvidia_path_loading(self):
         # Cover load_nvidia_paths and _get_nvidia_bin_lib_paths
         # We need to mock os.path.exists and os.listdir to simulate NVIDIA folders
-
-        def os_exists_side_effect(path):
-            if "nvidia" in path or "site-packages" in path or "lib" in path:
-                return True
-            return False
-
         with patch("site.getsitepackages", return_value=["/site-packages"]), \
                 patch("sys.prefix", "/sys_prefix"), \
-                patch("os.path.exists", side_effect=os_exists_side_effect), \
-                patch("os.listdir", return_value=["cudnn", "cublas"]), \
-                patch("os.path.isdir", return_value=True), \
+                patch("os.path.exists", _nvidia_exists), \
+                patch("os.listdir", _listdir), \
+                patch("os.path.isdir", lambda _: True), \
                 patch("os.environ", {"PATH": ""}), \
                 patch("os.add_dll_directory", create=True) as m_add_dll:
 
@@ -406,7 +410,3 @@ class TestAutoSubtitleUltimate(unittest.TestCase):
                 # Logic: /site-packages/nvidia/cudnn/bin, lib...
                 # We expect multiple add_dll_directory calls
                 m_add_dll.assert_called()
-
-
-if __name__ == "__main__":
-    unittest.main()
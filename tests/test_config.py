@@ -1,109 +1,121 @@
 import unittest
-from unittest.mock import MagicMock, patch, mock_open
-import os
-import sys
+from unittest.mock import ANY, MagicMock, patch, mock_open
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+import pytest
+
+from modules import config
+from tests.fakes import restore_config, snapshot_config
+
+_FULL_CONFIG = {
+    "debug_logging": True,
+    "target_languages": {
+        "de": {"code": "deu_Latn", "label": "German"}
+    },
+    "whisper": {
+        "model_size": "medium",
+        "language": "en",
+        "use_vocal_separation": False,
+        "use_prompt": True,
+        "custom_prompt": "Smart prompt",
+        "custom_prompt_priority": True
+    },
+    "hallucinations": {
+        "silence_threshold": 0.5,
+        "repetition_threshold": 10,
+        "known_phrases": ["bad phrase"]
+    },
+    "models": {
+        "nllb": "facebook/nllb-distilled",
+        "audio_separator": "custom.ckpt"
+    },
+    "nllb": {
+        "num_beams": 3,
+        "length_penalty": 0.8
+    },
+    "vad": {
+        "min_silence_duration_ms": 300
+    },
+    "performance": {
+        "whisper_beam": 2,
+        "nllb_batch": 16
+    }
+}
+
+
+def _reset_config():
+    """Resets the config globals these tests assert on."""
+    config.TARGET_LANGUAGES = {}
+    config.WHISPER_MODEL_SIZE = "small"
+    config.FORCED_LANGUAGE = None
+    config.USE_VOCAL_SEPARATION = True
+    config.HALLUCINATION_SILENCE_THRESHOLD = 0.9
+
+
+def _check_full(optimizer, log):
+    assert config.DEBUG_LOGGING
+    assert config.WHISPER_MODEL_SIZE == "medium"
+    assert config.FORCED_LANGUAGE == "en"
+    assert not config.USE_VOCAL_SEPARATION
+    assert config.INITIAL_PROMPT == "Smart prompt"
+    assert config.HALLUCINATION_SILENCE_THRESHOLD == 0.5
+    assert config.NLLB_MODEL_ID == "facebook/nllb-distilled"
+    assert config.NLLB_NUM_BEAMS == 3
+    assert config.VAD_MIN_SILENCE_MS == 300
+
+    # Optimizer overrides
+    assert optimizer.config["whisper_beam"] == 2
+    assert optimizer.config["nllb_batch"] == 16
+
+
+def _check_missing(optimizer, log):
+    # Should have populated defaults
+    assert "es" in config.TARGET_LANGUAGES
+
+
+def _check_invalid(optimizer, log):
+    log.assert_called_with(ANY, "ERROR")
+
+
+@pytest.fixture
+def config_env(request):
+    """Patches the config.yaml read path for one (payload, exists, side_effect) case."""
+    payload, exists, side = request.param
+    snapshot = snapshot_config(config)
+    _reset_config()
+    with patch("os.path.exists", return_value=exists), \
+            patch("builtins.open", mock_open()), \
+            patch("yaml.safe_load", side_effect=side, return_value=payload):
+        yield
+    restore_config(config, snapshot)
+
+
+@pytest.mark.parametrize("config_env,expected,check", [
+    ((_FULL_CONFIG, True, None), True, _check_full),
+    ((None, False, None), True, _check_missing),  # Returns True but uses defaults
+    ((None, True, Exception("YAML Error")), False, _check_invalid),
+], indirect=["config_env"], ids=["full", "missing", "invalid"])
+def test_load_config(config_env, expected, check):
+    optimizer = MagicMock()
+    optimizer.config = {}
+    log = MagicMock()
+
+    assert config.load_config(optimizer, log) is expected
+    check(optimizer, log)
 
 
 class TestConfig(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._config_snapshot = snapshot_config(config)
+
     def setUp(self):
-        global config
-        from modules import config
-        # Reset globals
-        config.TARGET_LANGUAGES = {}
-        config.WHISPER_MODEL_SIZE = "small"
-        config.FORCED_LANGUAGE = None
-        config.USE_VOCAL_SEPARATION = True
-        config.HALLUCINATION_SILENCE_THRESHOLD = 0.9
-
-    @patch("yaml.safe_load")
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("os.path.exists", return_value=True)
-    def test_load_full_config(self, mock_exists, mock_file, mock_yaml):
-        # Return dict directly, bypassing parser
-        mock_yaml.return_value = {
-            "debug_logging": True,
-            "target_languages": {
-                "de": {"code": "deu_Latn", "label": "German"}
-            },
-            "whisper": {
-                "model_size": "medium",
-                "language": "en",
-                "use_vocal_separation": False,
-                "use_prompt": True,
-                "custom_prompt": "Smart prompt",
-                "custom_prompt_priority": True
-            },
-            "hallucinations": {
-                "silence_threshold": 0.5,
-                "repetition_threshold": 10,
-                "known_phrases": ["bad phrase"]
-            },
-            "models": {
-                "nllb": "facebook/nllb-distilled",
-                "audio_separator": "custom.ckpt"
-            },
-            "nllb": {
-                "num_beams": 3,
-                "length_penalty": 0.8
-            },
-            "vad": {
-                "min_silence_duration_ms": 300
-            },
-            "performance": {
-                "whisper_beam": 2,
-                "nllb_batch": 16
-            }
-        }
-
-        optimizer = MagicMock()
-        optimizer.config = {}
-        log = MagicMock()
-
-        res = config.load_config(optimizer, log)
-
-        self.assertTrue(res)
-        self.assertTrue(config.DEBUG_LOGGING)
-        self.assertEqual(config.WHISPER_MODEL_SIZE, "medium")
-        self.assertEqual(config.FORCED_LANGUAGE, "en")
-        self.assertFalse(config.USE_VOCAL_SEPARATION)
-        self.assertEqual(config.INITIAL_PROMPT, "Smart prompt")
-        self.assertEqual(config.HALLUCINATION_SILENCE_THRESHOLD, 0.5)
-        self.assertEqual(config.NLLB_MODEL_ID, "facebook/nllb-distilled")
-        self.assertEqual(config.NLLB_NUM_BEAMS, 3)
-        self.assertEqual(config.VAD_MIN_SILENCE_MS, 300)
-
-        # Optimizer overrides
-        self.assertEqual(optimizer.config["whisper_beam"], 2)
-        self.assertEqual(optimizer.config["nllb_batch"], 16)
-
-    @patch("os.path.exists", return_value=False)
-    def test_load_config_missing(self, mock_exists):
-        log = MagicMock()
-        res = config.load_config(MagicMock(), log)
-        self.assertTrue(res)  # Returns True but uses defaults
-        # Should have populated defaults
-        self.assertIn("es", config.TARGET_LANGUAGES)
-
-    @patch("yaml.safe_load", side_effect=Exception("YAML Error"))
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("os.path.exists", return_value=True)
-    def test_load_config_invalid(self, mock_exists, mock_file, mock_yaml):
-        log = MagicMock()
-        res = config.load_config(MagicMock(), log)
-        self.assertFalse(res)
-        log.assert_called_with(unittest.mock.ANY, "ERROR")
+        _reset_config()
+
+    def tearDown(self):
+        restore_config(config, self._config_snapshot)
 
     def test_get_nllb_code(self):
         config.TARGET_LANGUAGES = {"xx": {"code": "xxx_Latn"}}
         self.assertEqual(config.get_nllb_code("xx"), "xxx_Latn")
         self.assertEqual(config.get_nllb_code("es"), "spa_Latn")  # fallback
         self.assertEqual(config.get_nllb_code("unknown"), "eng_Latn")  # default
-
-
-if __name__ == "__main__":
-    unittest.main()
@@ -1,13 +1,30 @@
 import auto_subtitle
+import io
 import unittest
-from unittest.mock import MagicMock, patch
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from unittest.mock import DEFAULT, MagicMock, patch
 import os
 import sys
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+from tests.fakes import FakeFS, log_calls
+
+
+# Shared failure instances for side_effect; str() is stable, so log assertions still match
+_DUR_FAIL = Exception("Error")
+_SAVE_FAIL = Exception("Save fail")
+_TRANS_FAIL = Exception("Trans fail")
+
+
+@contextmanager
+def block_import(name):
+    """Makes `import name` (and its submodules) raise ImportError natively."""
+    saved = {k: sys.modules.pop(k) for k in list(sys.modules) if k == name or k.startswith(name + ".")}
+    sys.modules[name] = None
+    try:
+        yield
+    finally:
+        sys.modules.pop(name, None)
+        sys.modules.update(saved)
 
 
 class TestCoverageAutoSubtitle(unittest.TestCase):
@@ -16,55 +33,42 @@ class TestCoverageAutoSubtitle(unittest.TestCase):
         # Reset torch handle to allow re-init
         auto_subtitle.torch = None
 
-    @patch("auto_subtitle.print_progress_bar")
-    @patch("auto_subtitle.log")
-    @patch("sys.exit")
-    def test_init_torch_fail(self, mock_exit, mock_log, mock_bar):
-        with patch.dict("sys.modules", {"torch": MagicMock(side_effect=ImportError("No torch"))}):
-            # We need to trigger the import inside _init_torch_and_hardware
-            with patch("builtins.__import__", side_effect=lambda name, *args, **kwargs:
-                       exec("raise ImportError('No torch')") if name == "torch" else MagicMock()):
-                auto_subtitle._init_torch_and_hardware(1, 6)
-                mock_exit.assert_called_with(1)
-
-    @patch("auto_subtitle.print_progress_bar")
-    @patch("auto_subtitle.log")
-    @patch("sys.exit")
-    def test_init_transformers_fail(self, mock_exit, mock_log, mock_bar):
-        with patch("builtins.__import__", side_effect=lambda name, *args, **kwargs:
-                   exec("raise ImportError('No transformers')") if name == "transformers" else MagicMock()):
-            auto_subtitle._init_nvidia_and_transformers(3, 6)
-            mock_exit.assert_called_with(1)
-
-    @patch("auto_subtitle.print_progress_bar")
-    @patch("auto_subtitle.log")
-    @patch("sys.exit")
-    def test_init_whisper_fail(self, mock_exit, mock_log, mock_bar):
-        with patch("builtins.__import__", side_effect=lambda name, *args, **kwargs:
-                   exec("raise ImportError('No whisper')") if name == "faster_whisper" else MagicMock()):
-            auto_subtitle._init_whisper_and_separator(4, 6)
-            mock_exit.assert_called_with(1)
-
-    @patch("auto_subtitle.print_progress_bar")
-    @patch("auto_subtitle.log")
-    def test_init_separator_skip(self, mock_log, mock_bar):
-        with patch("builtins.__import__", side_effect=lambda name, *args, **kwargs:
-                   exec("raise ImportError('No separator')") if "audio_separator" in name else MagicMock()):
+    def test_init_required_import_fail(self):
+        cases = [
+            ("torch", auto_subtitle._init_torch_and_hardware, 1, 6),
+            ("transformers", auto_subtitle._init_nvidia_and_transformers, 3, 6),
+            ("faster_whisper", auto_subtitle._init_whisper_and_separator, 4, 6),
+        ]
+        with ExitStack() as st:
+            st.enter_context(patch.multiple("auto_subtitle", print_progress_bar=DEFAULT, log=DEFAULT))
+            mock_exit = st.enter_context(patch("sys.exit"))
+            for name, init_fn, step, total in cases:
+                with self.subTest(module=name), block_import(name):
+                    init_fn(step, total)
+                    mock_exit.assert_called_with(1)
+                    mock_exit.reset_mock()
+
+    def test_init_separator_skip(self):
+        with ExitStack() as st:
+            mocks = st.enter_context(patch.multiple("auto_subtitle", print_progress_bar=DEFAULT, log=DEFAULT))
+            st.enter_context(block_import("audio_separator"))
             auto_subtitle._init_whisper_and_separator(5, 6)
-            mock_log.assert_called()
+            mocks["log"].assert_called()
 
     def test_init_ai_engine_already_init(self):
         auto_subtitle.torch = MagicMock()
-        with patch("builtins.print") as mock_print:
+        buf = io.StringIO()
+        with redirect_stdout(buf):
             auto_subtitle.init_ai_engine()
-            mock_print.assert_not_called()
+        self.assertEqual(buf.getvalue(), "")
 
     def test_get_nvidia_bin_lib_paths(self):
-        with patch("os.path.exists", return_value=True), \
-                patch("os.path.isdir", return_value=True), \
-                patch("os.listdir", return_value=["item1"]):
+        item = os.path.join("site-packages", "nvidia", "item1")
+        expected = [os.path.join(item, "bin"), os.path.join(item, "lib")]
+        with ExitStack() as stack:
+            FakeFS(dirs={os.path.dirname(item), item, *expected}, listing=("item1",)).install(stack)
             paths = auto_subtitle._get_nvidia_bin_lib_paths("site-packages")
-            self.assertTrue(len(paths) > 0)
+        self.assertEqual(paths, expected)
 
     @patch("os.add_dll_directory", create=True)
     def test_apply_paths_to_env(self, mock_add):
@@ -76,9 +80,7 @@ class TestCoverageAutoSubtitle(unittest.TestCase):
                 mock_add.assert_called_with("/new/path")
 
     def test_load_nvidia_paths_torch_fail(self):
-        with patch("site.getsitepackages", return_value=[]), \
-            patch("builtins.__import__", side_effect=lambda name, *args, **kwargs:
-                  exec("raise ImportError()") if name == "torch" else MagicMock()):
+        with patch("site.getsitepackages", return_value=[]), block_import("torch"):
             auto_subtitle.load_nvidia_paths()
 
     def test_check_resume_empty_srt(self):
@@ -91,43 +93,47 @@ class TestCoverageAutoSubtitle(unittest.TestCase):
     def test_embed_subtitles_empty(self):
         self.assertIsNone(auto_subtitle.embed_subtitles("vid.mp4", []))
 
-    @patch("auto_subtitle.utils.get_audio_duration", side_effect=Exception("Error"))
-    @patch("auto_subtitle.log")
-    @patch("os.path.exists", return_value=True)
-    @patch("os.remove")
-    def test_embed_subtitles_exception(self, mock_remove, mock_exists, mock_log, mock_dur):
-        auto_subtitle.embed_subtitles("vid.mp4", [("s.srt", "en", "English")])
+    def test_embed_subtitles_exception(self):
+        with ExitStack() as st:
+            st.enter_context(patch("auto_subtitle.utils.get_audio_duration", side_effect=_DUR_FAIL))
+            mock_log = st.enter_context(patch("auto_subtitle.log"))
+            st.enter_context(patch("os.path.exists", return_value=True))
+            mock_remove = st.enter_context(patch("os.remove"))
+            auto_subtitle.embed_subtitles("vid.mp4", [("s.srt", "en", "English")])
         mock_log.assert_called()
         mock_remove.assert_called()
 
-    @patch("auto_subtitle._obtain_segments", return_value=([], None, None))
-    @patch("auto_subtitle.log")
-    def test_process_video_no_speech(self, mock_log, mock_ob):
-        res = auto_subtitle.process_video("vid.mp4", MagicMock())
+    def test_process_video_no_speech(self):
+        with ExitStack() as st:
+            mocks = st.enter_context(patch.multiple("auto_subtitle", _obtain_segments=DEFAULT, log=DEFAULT))
+            mocks["_obtain_segments"].return_value = ([], None, None)
+            res = auto_subtitle.process_video("vid.mp4", MagicMock())
         self.assertEqual(res, ([], None, None))
-        mock_log.assert_any_call("No speech detected.", "WARNING")
-
-    @patch("auto_subtitle._obtain_segments", return_value=([MagicMock()], "en", "audio.wav"))
-    @patch("auto_subtitle.utils.save_srt", side_effect=Exception("Save fail"))
-    @patch("auto_subtitle.log")
-    @patch("auto_subtitle.translate_segments")
-    @patch("auto_subtitle.embed_subtitles")
-    def test_process_video_save_srt_error(self, mock_embed, mock_trans, mock_log, mock_save, mock_ob):
-        auto_subtitle.process_video("vid.mp4", MagicMock())
-        mock_log.assert_any_call("  [Error] Failed to save source SRT: Save fail", "ERROR")
-
-    @patch("auto_subtitle._obtain_segments", return_value=([MagicMock()], "en", "audio.wav"))
-    @patch("auto_subtitle.translate_segments", side_effect=Exception("Trans fail"))
-    @patch("auto_subtitle.log")
-    def test_process_video_translation_fail(self, mock_log, mock_trans, mock_ob):
-        auto_subtitle.process_video("vid.mp4", MagicMock())
-        mock_log.assert_any_call("Translation failed: Trans fail", "ERROR")
+        self.assertIn((("No speech detected.", "WARNING"), ()), log_calls(mocks["log"]))
+
+    def test_process_video_save_srt_error(self):
+        with ExitStack() as st:
+            st.enter_context(patch("auto_subtitle.utils.save_srt", side_effect=_SAVE_FAIL))
+            mocks = st.enter_context(patch.multiple(
+                "auto_subtitle", _obtain_segments=DEFAULT, log=DEFAULT, translate_segments=DEFAULT, embed_subtitles=DEFAULT))
+            mocks["_obtain_segments"].return_value = ([MagicMock()], "en", "audio.wav")
+            auto_subtitle.process_video("vid.mp4", MagicMock())
+        self.assertIn((("  [Error] Failed to save source SRT: Save fail", "ERROR"), ()), log_calls(mocks["log"]))
+
+    def test_process_video_translation_fail(self):
+        with ExitStack() as st:
+            mocks = st.enter_context(patch.multiple(
+                "auto_subtitle", _obtain_segments=DEFAULT, translate_segments=DEFAULT, log=DEFAULT))
+            mocks["_obtain_segments"].return_value = ([MagicMock()], "en", "audio.wav")
+            mocks["translate_segments"].side_effect = _TRANS_FAIL
+            auto_subtitle.process_video("vid.mp4", MagicMock())
+        self.assertIn((("Translation failed: Trans fail", "ERROR"), ()), log_calls(mocks["log"]))
 
     def test_get_input_files_exclude_multilang(self):
-        with patch("argparse.ArgumentParser.parse_args", return_value=MagicMock(input_path="folder", cpu=False, lang=None, prompt=None)), \
-                patch("os.path.isfile", return_value=False), \
-                patch("os.path.isdir", return_value=True), \
-                patch("os.walk", return_value=[(".", [], ["vid.mp4", "vid_multilang.mp4"])]):
+        args = MagicMock(input_path="folder", cpu=False, lang=None, prompt=None)
+        with ExitStack() as stack:
+            FakeFS(dirs={"folder"}, walk=[(".", [], ["vid.mp4", "vid_multilang.mp4"])]).install(stack)
+            stack.enter_context(patch("argparse.ArgumentParser.parse_args", return_value=args))
             files, _, _ = auto_subtitle.get_input_files()
             self.assertEqual(len(files), 1)
 
@@ -138,7 +144,3 @@ class TestCoverageAutoSubtitle(unittest.TestCase):
                 patch("os.path.isdir", return_value=False):
             auto_subtitle.get_input_files()
             mock_exit.assert_called_with(1)
-
-
-if __name__ == "__main__":
-    unittest.main()
@@ -1,17 +1,20 @@
 from modules import config
 import unittest
 from unittest.mock import MagicMock, patch
-import os
-import sys
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+from tests.fakes import restore_config, snapshot_config
 
 
 class TestCoverageConfig(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # Loader helpers rebind module globals; restore them so tests stay order-independent
+        cls._config_snapshot = snapshot_config(config)
+
+    def tearDown(self):
+        restore_config(config, self._config_snapshot)
+
     def test_load_whisper_config_extra(self):
         w_conf = {
             "model_size": "base",
@@ -38,12 +41,12 @@ class TestCoverageConfig(unittest.TestCase):
         h_conf = {
             "silence_threshold": 0.5,
             "repetition_threshold": 10,
-            "known_phrases": ["test phrase"]
+            "known_phrases": ["Test Phrase"]
         }
         config._load_hallucination_config(h_conf, MagicMock())
         self.assertEqual(config.HALLUCINATION_SILENCE_THRESHOLD, 0.5)
         self.assertEqual(config.HALLUCINATION_REPETITION_THRESHOLD, 10)
-        self.assertEqual(config.HALLUCINATION_PHRASES, ["test phrase"])
+        self.assertEqual(config.HALLUCINATION_PHRASES, frozenset({"test phrase"}))
 
     def test_load_performance_overrides_empty(self):
         opt = MagicMock()
@@ -102,7 +105,3 @@ class TestCoverageConfig(unittest.TestCase):
                 patch("builtins.open", side_effect=Exception("Error")):
             res = config.load_config(MagicMock(), MagicMock())
             self.assertFalse(res)
-
-
-if __name__ == "__main__":
-    unittest.main()
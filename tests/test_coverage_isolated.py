@@ -1,97 +1,116 @@
 from modules import isolated_translator
-import unittest
-from unittest.mock import MagicMock, patch, mock_open
-import os
+import io
 import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import DEFAULT, MagicMock, patch
+
+from tests.fakes import TRANSLATOR_SPEC, log_calls
+
+
+# Shared failure instances for side_effect; str() is stable, so log assertions still match
+_ERROR = Exception("error")
+_FAIL = Exception("fail")
+_FATAL = Exception("fatal")
+
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+def _sio_open(data):
+    """open() replacement serving `data` from a fresh StringIO on every call."""
+    return lambda *a, **k: io.StringIO(data)
 
 
 class TestCoverageIsolated(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # One translator double for the class; tearDown wipes what each test configured
+        cls.translator = MagicMock(spec=TRANSLATOR_SPEC)
+
+    def setUp(self):
+        self._orig_argv = sys.argv[:]
+
+    def tearDown(self):
+        sys.argv[:] = self._orig_argv
+        self.translator.reset_mock(side_effect=True, return_value=True)
+
     def test_run_translation_worker_batch_size_zero(self):
-        with patch("modules.isolated_translator.open", mock_open(read_data='[{"text": "hi", "end": 1}]')), \
-                patch("modules.isolated_translator.ModelManager"), \
-                patch("modules.isolated_translator.OPTIMIZER") as mock_opt, \
-                patch("modules.isolated_translator.log"):
-            mock_opt.config = {"nllb_batch": 5}
+        with patch.multiple("modules.isolated_translator", open=_sio_open('[{"text": "hi", "end": 1}]'),
+                            ModelManager=DEFAULT, OPTIMIZER=MagicMock(config={"nllb_batch": 5}), log=DEFAULT):
             # Should not crash and should use 5
             isolated_translator.run_translation_worker("in.json", "out.json", "en", "ro", 0, "Romanian", "prefix")
 
     def test_run_translation_worker_exception(self):
-        with patch("modules.isolated_translator.open", mock_open(read_data='[{"text": "hi", "end": 1}]')), \
-                patch("modules.isolated_translator.ModelManager") as mock_mm, \
-                patch("modules.isolated_translator.log"):
-            mock_mm.return_value.get_nllb.return_value.translate.side_effect = Exception("error")
+        with patch.multiple("modules.isolated_translator", open=_sio_open('[{"text": "hi", "end": 1}]'),
+                            ModelManager=DEFAULT, log=DEFAULT) as mocks:
+            mocks["ModelManager"].return_value.get_nllb.return_value.translate.side_effect = _ERROR
             with self.assertRaises(Exception):
                 isolated_translator.run_translation_worker("in.json", "out.json", "en", "ro", 1, "Romanian", "prefix")
 
-    def test_translate_batch_chunk_error(self):
-        translator = MagicMock()
-        translator.translate.side_effect = Exception("fail")
+    def test_translate_batch_chunk(self):
+        # (name, translate side_effect, translate return_value, expected, logged)
+        cases = [
+            ("error", _FAIL, None, ["Translation Error", "Translation Error"], True),
+            ("ok", None, ["r1", "r2"], ["r1", "r2"], False),
+        ]
         with patch("modules.isolated_translator.log") as mock_log:
-            res = isolated_translator._translate_batch_chunk(translator, ["t1"], "en", "ro")
-            self.assertEqual(res, ["Translation Error"])
-            mock_log.assert_called()
+            for name, effect, ret, expected, logged in cases:
+                with self.subTest(name):
+                    mock_log.reset_mock()
+                    self.translator.translate.side_effect = effect
+                    self.translator.translate.return_value = ret
+                    res = isolated_translator._translate_batch_chunk(self.translator, ["t1", "t2"], "en", "ro")
+                    self.assertEqual(res, expected)
+                    self.assertEqual(mock_log.called, logged)
 
     def test_process_single_job_padding(self):
-        translator = MagicMock()
-        translator.translate.return_value = ["res1"]  # only 1 result for 2 texts
+        self.translator.translate.return_value = ["res1"]  # only 1 result for 2 texts
         job = {"lang": "fr", "tgt_code": "fra_Latn", "input": "in.json", "output": "out.json"}
-        with patch("modules.isolated_translator.open", mock_open(read_data='[{"text": "t1", "end": 1}, {"text": "t2", "end": 2}]')), \
-                patch("modules.isolated_translator.OPTIMIZER") as mock_opt, \
-                patch("modules.isolated_translator.log"), \
+        with patch.multiple("modules.isolated_translator",
+                            open=_sio_open('[{"text": "t1", "end": 1}, {"text": "t2", "end": 2}]'),
+                            OPTIMIZER=MagicMock(config={"nllb_batch": 10}), log=DEFAULT,
+                            _translate_batch_chunk=MagicMock(return_value=["res1"])), \
                 patch("os.path.exists", return_value=False), \
-                patch("os.rename"), \
-                patch("modules.isolated_translator._translate_batch_chunk", return_value=["res1"]):
-            mock_opt.config = {"nllb_batch": 10}
-            isolated_translator._process_single_job(job, 0, 1, translator)
+                patch("os.rename"):
+            isolated_translator._process_single_job(job, 0, 1, self.translator)
 
     def test_run_batch_translation_worker_no_jobs(self):
-        with patch("modules.isolated_translator.open", mock_open(read_data='{"jobs": []}')), \
-                patch("modules.isolated_translator.log") as mock_log:
+        with patch.multiple("modules.isolated_translator", open=_sio_open('{"jobs": []}'), log=DEFAULT) as mocks:
             isolated_translator.run_batch_translation_worker("manifest.json")
-            mock_log.assert_any_call("[Isolation] No jobs in manifest. Exiting.")
-
-    def test_main_usage(self):
-        with patch("sys.argv", ["script.py"]), \
-                patch("sys.exit") as mock_exit, \
-                patch("builtins.print") as mock_print:
-            isolated_translator.main()
-            mock_exit.assert_called_with(1)
-            mock_print.assert_called()
-
-    def test_main_batch_mode(self):
-        with patch("sys.argv", ["script.py", "--batch", "manifest.json"]), \
-                patch("modules.isolated_translator.run_batch_translation_worker") as mock_run, \
-                patch("sys.exit", side_effect=SystemExit) as mock_exit:
-            with self.assertRaises(SystemExit):
-                isolated_translator.main()
-            mock_run.assert_called_with("manifest.json")
-            mock_exit.assert_called_with(0)
-
-    def test_main_step_args(self):
-        with patch("sys.argv", ["script.py", "in.json", "out.json", "en", "ro", "8", "Romanian", "1", "4"]), \
-                patch("modules.isolated_translator.run_translation_worker") as mock_run:
-            isolated_translator.main()
-            mock_run.assert_called()
-            # prefix check
-            args = mock_run.call_args[0]
-            self.assertIn("1/4", args[-1])
-
-    def test_main_fatal_error(self):
-        with patch("sys.argv", ["script.py", "in.json", "out.json", "en", "ro", "8", "Romanian"]), \
-                patch("modules.isolated_translator.run_translation_worker", side_effect=Exception("fatal")), \
-                patch("modules.isolated_translator.log") as mock_log, \
-                patch("traceback.print_exc"), \
-                patch("sys.exit") as mock_exit:
-            isolated_translator.main()
-            mock_log.assert_any_call("[Isolation] FATAL ERROR: fatal")
-            mock_exit.assert_called_with(1)
-
+            self.assertIn((("[Isolation] No jobs in manifest. Exiting.",), ()), log_calls(mocks["log"]))
 
-if __name__ == "__main__":
-    unittest.main()
+    def test_main_modes(self):
+        legacy = ["script.py", "in.json", "out.json", "en", "ro", "8", "Romanian"]
+        # (name, argv, worker side effect, expected exit code, check(batch, run, log))
+        cases = [
+            ("usage", ["script.py"], None, 1,
+             lambda batch, run, log: self.assertIn("usage", buf.getvalue().lower())),
+            ("batch", ["script.py", "--batch", "manifest.json"], None, 0,
+             lambda batch, run, log: batch.assert_called_once_with("manifest.json")),
+            ("step7", legacy, None, None,
+             lambda batch, run, log: self.assertEqual(run.call_args.args[-1], "  [Translate] Romanian")),
+            ("step9", legacy + ["1", "4"], None, None,
+             lambda batch, run, log: self.assertEqual(run.call_args.args[-1], "  [Translate 1/4] Romanian")),
+            ("fatal", legacy, _FATAL, 1,
+             lambda batch, run, log: self.assertIn((("[Isolation] FATAL ERROR: fatal",), ()), log_calls(log))),
+        ]
+        buf = io.StringIO()
+        with redirect_stdout(buf), \
+                patch("sys.exit", side_effect=SystemExit) as mock_exit, \
+                patch("traceback.print_exc"), \
+                patch.multiple("modules.isolated_translator", log=DEFAULT,
+                               run_batch_translation_worker=DEFAULT, run_translation_worker=DEFAULT) as mocks:
+            mock_log, mock_batch, mock_run = mocks["log"], mocks["run_batch_translation_worker"], mocks["run_translation_worker"]
+            for name, argv, effect, code, check in cases:
+                with self.subTest(name):
+                    for m in (mock_exit, mock_log, mock_batch, mock_run):
+                        m.reset_mock()
+                    mock_run.side_effect = effect
+                    sys.argv[:] = argv
+                    if code is None:
+                        isolated_translator.main()
+                        mock_exit.assert_not_called()
+                    else:
+                        with self.assertRaises(SystemExit):
+                            isolated_translator.main()
+                        mock_exit.assert_called_once_with(code)
+                    check(mock_batch, mock_run, mock_log)
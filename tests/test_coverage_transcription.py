@@ -1,17 +1,22 @@
 from modules import transcription
+import os
 import unittest
+from contextlib import ExitStack
 from unittest.mock import MagicMock, patch
-import os
-import sys
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+from tests.fakes import FakeFS, log_calls
+
+
+# Shared failure instance for side_effect
+_SEP_FAIL = Exception("Sep fail")
 
 
 class TestCoverageTranscription(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        cls.HALLUCINATION_LOWER = frozenset(p.lower() for p in ["Nu uitați să dați like", "Abonează-te"])
+
     def test_get_separated_vocal_path_success(self):
         with patch("os.listdir", return_value=["vid_(Vocals)_.wav"]), \
                 patch("os.path.join", return_value="dir/vid_(Vocals)_.wav"):
@@ -36,21 +41,20 @@ class TestCoverageTranscription(unittest.TestCase):
 
     def test_detect_and_separate_vocals_fail(self):
         mm = MagicMock()
-        mm.get_separator.side_effect = Exception("Sep fail")
+        mm.get_separator.side_effect = _SEP_FAIL
         with patch("modules.config.USE_VOCAL_SEPARATION", True), \
                 patch("modules.transcription._get_separated_vocal_path", return_value=None), \
                 patch("modules.utils.extract_clean_audio"), \
                 patch("modules.transcription.log") as mock_log:
             res = transcription._detect_and_separate_vocals("vid.mp4", mm)
             self.assertEqual(res, "vid.mp4")
-            mock_log.assert_any_call("  [Sep] Warning: Separation failed (Sep fail). Using original audio.", "WARNING")
+            self.assertIn((("  [Sep] Warning: Separation failed (Sep fail). Using original audio.", "WARNING"), ()), log_calls(mock_log))
 
     def test_filter_hallucinations_branches(self):
-        seg = MagicMock(text="Nu uitați să dați like")
-        phrases = ["nu uitați să dați like"]
-        filtered, count = transcription._filter_hallucinations([seg], phrases)
-        self.assertEqual(len(filtered), 0)
-        self.assertEqual(count, 1)
+        segs = [MagicMock(text="Nu uitați să dați like"), MagicMock(text="Abonează-te!!"), MagicMock(text="Salut")]
+        filtered, count = transcription._filter_hallucinations(segs, self.HALLUCINATION_LOWER)
+        self.assertEqual(filtered, segs[2:])
+        self.assertEqual(count, 2)
 
     def test_transcribe_video_audio_no_prompt_log(self):
         mm = MagicMock()
@@ -61,7 +65,7 @@ class TestCoverageTranscription(unittest.TestCase):
                 patch("modules.utils.extract_clean_audio", return_value="audio.wav"), \
                 patch("modules.transcription.log") as mock_log:
             transcription.transcribe_video_audio("vid.mp4", mm, forced_prompt=None)
-            mock_log.assert_any_call("  [Whisper] Config: No Input Prompt")
+            self.assertIn((("  [Whisper] Config: No Input Prompt",), ()), log_calls(mock_log))
 
     def test_transcribe_video_audio_runtime_error(self):
         mm = MagicMock()
@@ -81,16 +85,18 @@ class TestCoverageTranscription(unittest.TestCase):
                 patch("modules.utils.extract_clean_audio", return_value="audio.wav"), \
                 patch("modules.transcription.log") as mock_log:
             transcription.transcribe_video_audio("vid.mp4", mm)
-            mock_log.assert_any_call("  [Warning] Low language confidence (0.10).", "WARNING")
+            self.assertIn((("  [Warning] Low language confidence (0.10).", "WARNING"), ()), log_calls(mock_log))
 
     def test_process_separator_outputs(self):
         output_files = ["dir/vid_(Vocals).wav", "dir/vid_(Instrumental).wav"]
-        with patch("os.path.abspath", side_effect=lambda x: x), \
-                patch("os.path.exists", return_value=True), \
-                patch("os.remove"), \
-                patch("os.rename"):
+        vocals = os.path.join("target", "vid_(Vocals).wav")
+        background = os.path.join("target", "vid_(Background).wav")
+        with ExitStack() as stack:
+            # A stale vocal track in the target dir must be replaced
+            fs = FakeFS(files={vocals, *map(os.path.abspath, output_files)}).install(stack)
             res = transcription._process_separator_outputs(output_files, "target")
-            self.assertIn("vid_(Vocals).wav", res)
+        self.assertEqual(res, vocals)
+        self.assertEqual(fs.files, {vocals, background})
 
     def test_transcribe_video_audio_forced_lang(self):
         mm = MagicMock()
@@ -100,8 +106,4 @@ class TestCoverageTranscription(unittest.TestCase):
                 patch("modules.utils.extract_clean_audio", return_value="audio.wav"), \
                 patch("modules.transcription.log") as mock_log:
             transcription.transcribe_video_audio("vid.mp4", mm, forced_lang="ro")
-            mock_log.assert_any_call("  [Whisper] Config: Forced Language='ro'")
-
-
-if __name__ == "__main__":
-    unittest.main()
+            self.assertIn((("  [Whisper] Config: Forced Language='ro'",), ()), log_calls(mock_log))
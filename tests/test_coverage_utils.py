@@ -1,19 +1,88 @@
 from modules import utils
 import unittest
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import Mock, patch, mock_open
 import os
 import sys
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+import pytest
 
+from tests.fakes import PROC_SPEC, SwapMixin
 
-class TestCoverageUtils(unittest.TestCase):
+
+# (line, next_line, corrupted) cases for _check_srt_corruption
+_SRT_CORRUPTION_CASES = (
+    ("1", "Not a timestamp", True),
+    ("31401:58:00,000 --> 00:00:02,000", None, True),
+    ("1", "00:00:00,000 --> 00:00:01,000", False),
+)
+# Chunks with a non-digit index and an unparseable timestamp; parse_srt must drop both
+_SRT_GARBAGE = "NotADigit\n00:00:00,000 --> 00:00:01,000\nText\n\n2\nInvalidTime\nText"
+# (args, kwargs) for print_progress_bar: zero total, non-numeric input, speed/ETA, over-long prefix
+_PROGRESS_BAR_CASES = (
+    ((0, 0), {}),
+    (("a", "b"), {}),
+    ((50, 100), {"speed": 1.0, "eta": 10}),
+    ((50, 100), {"prefix": "A" * 100}),
+)
+
+
+def _raise_oserror(path):
+    raise OSError("Permission denied")
+
+
+@pytest.fixture
+def stdout_mock(monkeypatch):
+    """Records sys.stdout writes for one case and pins the terminal to 80 columns."""
+    writes = []
+    monkeypatch.setattr(sys.stdout, "write", writes.append)
+    monkeypatch.setattr(sys.stdout, "flush", lambda: None)
+    monkeypatch.setattr("shutil.get_terminal_size", lambda fallback=None: os.terminal_size((80, 20)))
+    return writes
+
+
+@pytest.mark.parametrize("args,kwargs", _PROGRESS_BAR_CASES)
+def test_print_progress_bar_edge_cases(args, kwargs, stdout_mock):
+    utils.print_progress_bar(*args, **kwargs)
+    assert stdout_mock[0].startswith("\r\033[K")
+    assert len(stdout_mock[0]) <= 80 + len("\r\033[K")
+
+
+def test_print_progress_bar_unicode_fallback(stdout_mock, monkeypatch):
+    def write(text):
+        stdout_mock.append(text)
+        if len(stdout_mock) == 1:
+            raise UnicodeEncodeError("utf-8", "", 0, 1, "mock")
+
+    monkeypatch.setattr(sys.stdout, "write", write)
+    utils.print_progress_bar(50, 100)
+    assert stdout_mock[1] == "\r" + "[" + "#" * 10 + "-" * 10 + "]  50.0%"
+
+
+@pytest.mark.parametrize("line,next_line,expected", _SRT_CORRUPTION_CASES)
+def test_check_srt_corruption(line, next_line, expected):
+    assert utils._check_srt_corruption(line, next_line) is expected
+
+
+@pytest.mark.parametrize("platform", ["linux", "win32"])
+def test_setup_signal_handlers(platform, monkeypatch):
+    import ctypes
+    console_handler = Mock(return_value=True)
+    monkeypatch.setattr(sys, "platform", platform)
+    monkeypatch.setattr(ctypes, "WINFUNCTYPE", lambda *sig: (lambda fn: fn), raising=False)
+    monkeypatch.setattr(ctypes.windll.kernel32, "SetConsoleCtrlHandler", console_handler, raising=False)
+    with patch("signal.signal") as mock_sig:
+        utils.setup_signal_handlers()
+    assert mock_sig.call_count == 2
+    assert console_handler.called == (platform == "win32")
+
+
+class TestCoverageUtils(SwapMixin, unittest.TestCase):
+
+    def setUp(self):
+        self._swap(utils, "log", lambda *args, **kwargs: None)
 
     def test_print_banner_with_optimizer(self):
-        mock_opt = MagicMock()
+        mock_opt = Mock()
         mock_opt.gpu_name = "TestGPU"
         mock_opt.vram_gb = 16
         mock_opt.profile = "HIGH"
@@ -26,64 +95,38 @@ class TestCoverageUtils(unittest.TestCase):
             utils.print_banner(mock_opt)
 
     def test_handle_shutdown_error(self):
-        proc = MagicMock()
+        proc = Mock(spec=PROC_SPEC)
+        proc.pid = 4321
         proc.poll.return_value = None
         proc.terminate.side_effect = Exception("Kill fail")
 
-        with patch("modules.utils.active_subprocesses", [proc]), \
-                patch("builtins.print"), \
-                patch("sys.exit"):
-            utils.handle_shutdown(None, None)
-            proc.terminate.assert_called()
+        # No group led by the pid, so the fallback terminate() runs and its failure is swallowed
+        with patch("sys.exit"), patch("sys.platform", "linux"), \
+                patch("os.killpg", create=True, side_effect=ProcessLookupError):
+            utils.handle_shutdown(None, None, procs=[proc], grace=0)
+        proc.terminate.assert_called()
 
     def test_init_console_exception(self):
         with patch("os.name", "nt"), \
                 patch("ctypes.windll.kernel32.GetStdHandle", side_effect=Exception("Ctypes fail"), create=True):
             utils.init_console()  # Should just pass
 
-    def test_setup_signal_handlers(self):
-        with patch("signal.signal") as mock_sig, \
-                patch("sys.platform", "linux"):
-            utils.setup_signal_handlers()
-            self.assertEqual(mock_sig.call_count, 2)
-
-    def test_setup_signal_handlers_windows(self):
-        with patch("signal.signal"), \
-                patch("sys.platform", "win32"), \
-                patch("ctypes.WINFUNCTYPE", return_value=lambda x: x, create=True), \
-                patch("ctypes.windll.kernel32.SetConsoleCtrlHandler", return_value=True, create=True):
-            utils.setup_signal_handlers()
-
-    def test_print_progress_bar_edge_cases(self):
-        with patch("sys.stdout.write"), patch("sys.stdout.flush"), patch("shutil.get_terminal_size") as mock_size:
-            mock_size.return_value = MagicMock(columns=80)
-            # Total 0
-            utils.print_progress_bar(0, 0)
-            # Invalid inputs
-            utils.print_progress_bar("a", "b")
-            # Speed/ETA
-            utils.print_progress_bar(50, 100, speed=1.0, eta=10)
-            # Very long prefix
-            utils.print_progress_bar(50, 100, prefix="A" * 100)
-            # Unicode error fallback
-            with patch("sys.stdout.write", side_effect=[UnicodeEncodeError('utf-8', u'', 0, 1, 'mock'), None]):
-                utils.print_progress_bar(50, 100)
-
     def test_get_ffmpeg_paths_fallback(self):
-        with patch("os.path.exists", return_value=False):
-            ffmpeg, ffprobe = utils.get_ffmpeg_paths()
-            self.assertEqual(ffmpeg, "ffmpeg")
-            self.assertEqual(ffprobe, "ffprobe")
+        self._swap(os.path, "exists", lambda path: False)
+        ffmpeg, ffprobe = utils.get_ffmpeg_paths()
+        self.assertEqual(ffmpeg, "ffmpeg")
+        self.assertEqual(ffprobe, "ffprobe")
 
     def test_parse_timestamp_extra(self):
         self.assertEqual(utils.parse_timestamp("00:00:01.500"), 1.5)
         self.assertEqual(utils.parse_timestamp("00:00:01"), 1.0)
+        self.assertEqual(utils.parse_timestamp("100:00:00,250"), 360000.25)
         self.assertEqual(utils.parse_timestamp("invalid"), 0.0)
 
     def test_process_ffmpeg_line_exception(self):
-        with patch("modules.utils.parse_timestamp", side_effect=Exception("Parse fail")), \
+        with patch("modules.utils.print_progress_bar", side_effect=Exception("Draw fail")), \
                 patch("gc.collect") as mock_gc:
-            utils._process_ffmpeg_line("time=00:00:01.00", 0, 100, "Desc")
+            utils._process_ffmpeg_line("out_time_us=1000000\n", 0, 100, "Desc")
             mock_gc.assert_called()
 
     def test_run_ffmpeg_progress_exception(self):
@@ -92,24 +135,22 @@ class TestCoverageUtils(unittest.TestCase):
                 utils.run_ffmpeg_progress(["cmd"], "desc", 100)
 
     def test_extract_clean_audio_reuse(self):
-        with patch("os.path.exists", return_value=True), \
-                patch("modules.utils.get_audio_duration", return_value=123.45), \
-                patch("modules.utils.log"):
-            res = utils.extract_clean_audio("video.mp4")
-            self.assertTrue(res.endswith("_temp.wav"))
+        self._swap(os.path, "exists", lambda path: True)
+        self._swap(utils, "get_audio_duration", lambda path: 123.45)
+        res = utils.extract_clean_audio("video.mp4")
+        self.assertTrue(res.endswith("_temp.wav"))
 
     def test_extract_clean_audio_fail(self):
-        with patch("os.path.exists", side_effect=[False, False]), \
-                patch("modules.utils.get_audio_duration", return_value=123.45), \
-                patch("modules.utils.run_ffmpeg_progress", side_effect=Exception("Extraction failed")), \
-                patch("modules.utils.log"):
+        self._swap(os.path, "exists", lambda path: False)
+        self._swap(utils, "get_audio_duration", lambda path: 123.45)
+        with patch("modules.utils.run_ffmpeg_progress", side_effect=Exception("Extraction failed")):
             with self.assertRaises(Exception):
                 utils.extract_clean_audio("video.mp4")
 
     def test_cleanup_temp_files_oserror(self):
-        with patch("os.listdir", return_value=["test.wav"]), \
-                patch("os.remove", side_effect=OSError("Permission denied")):
-            utils.cleanup_temp_files(".", "test", "video.mp4")  # Should not raise
+        self._swap(os, "listdir", lambda path: ["test.wav"])
+        self._swap(os, "remove", _raise_oserror)
+        utils.cleanup_temp_files(".", "test", "video.mp4")  # Should not raise
 
     def test_get_cpu_name_exception(self):
         with patch("sys.platform", "win32"), \
@@ -118,30 +159,23 @@ class TestCoverageUtils(unittest.TestCase):
             self.assertIsNotNone(name)
 
     def test_save_srt_failure_cleanup(self):
+        self._swap(os.path, "exists", lambda path: True)
+        mock_remove = self._swap(os, "remove", Mock())
         with patch("builtins.open", mock_open()), \
-                patch("os.replace", side_effect=Exception("Replace fail")), \
-                patch("os.path.exists", return_value=True), \
-                patch("os.remove") as mock_remove:
+                patch("os.replace", side_effect=Exception("Replace fail")):
             with self.assertRaises(Exception):
                 utils.save_srt([], "test.srt")
-            mock_remove.assert_called()
-
-    def test_check_srt_corruption(self):
-        self.assertTrue(utils._check_srt_corruption("1", "Not a timestamp"))
-        self.assertTrue(utils._check_srt_corruption("31401:58:00,000 --> 00:00:02,000"))
-        self.assertFalse(utils._check_srt_corruption("1", "00:00:00,000 --> 00:00:01,000"))
+        mock_remove.assert_called()
 
     def test_validate_srt_edge_cases(self):
+        self._swap(os.path, "exists", lambda path: True)
+        self._swap(os.path, "getsize", lambda path: 100)
         # Empty
-        with patch("os.path.exists", return_value=True), \
-                patch("os.path.getsize", return_value=100), \
-                patch("builtins.open", mock_open(read_data="   ")):
+        with patch("builtins.open", mock_open(read_data="   ")):
             self.assertFalse(utils.validate_srt("empty.srt"))
 
         # Missing separator
-        with patch("os.path.exists", return_value=True), \
-                patch("os.path.getsize", return_value=100), \
-                patch("builtins.open", mock_open(read_data="1\n00:00:00\nText")):
+        with patch("builtins.open", mock_open(read_data="1\n00:00:00\nText")):
             self.assertFalse(utils.validate_srt("no_sep.srt"))
 
     def test_parse_srt_corrupted(self):
@@ -150,12 +184,7 @@ class TestCoverageUtils(unittest.TestCase):
             self.assertEqual(utils.parse_srt("bad.srt"), [])
 
     def test_parse_srt_garbage_chunks(self):
-        content = "NotADigit\n00:00:00,000 --> 00:00:01,000\nText\n\n2\nInvalidTime\nText"
         with patch("modules.utils.validate_srt", return_value=True), \
-                patch("builtins.open", mock_open(read_data=content)):
+                patch("builtins.open", mock_open(read_data=_SRT_GARBAGE)):
             segs = utils.parse_srt("garbage.srt")
             self.assertEqual(len(segs), 0)
-
-
-if __name__ == "__main__":
-    unittest.main()
@@ -1,23 +1,34 @@
 import unittest
-from unittest.mock import MagicMock, patch, mock_open
-import os
+from unittest.mock import DEFAULT, Mock, patch, mock_open
 import json
 import sys
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+import pytest
 
-# Avoid global sys.modules hacks. conftest.py handles AI libs.
-# Delayed import inside tests to ensure mocks are active
+# Avoid global sys.modules hacks. conftest.py installs the AI-lib mocks before this import
+from modules import isolated_translator
+from tests.fakes import TRANSLATOR_SPEC
+
+# One open() double for the module; tests set the JSON payload, setUp clears it and the call history
+_JSON_MOPEN = mock_open()
+# Single-segment job input shared by the worker tests, encoded once at import
+_INPUT_DATA_JSON = json.dumps([{"text": "Source", "start": 0, "end": 1}])
 
 
 class TestIsolatedTranslator(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _model_manager(self, model_manager_mock):
+        model_manager_mock.reset_mock(return_value=True, side_effect=True)
+        self.mm = model_manager_mock
+
+    def setUp(self):
+        # Clear call history and the previous test's payload; None is mock_open's "serve read_data" default
+        _JSON_MOPEN.reset_mock()
+        _JSON_MOPEN.return_value.read.return_value = None
+
     def test_translate_batch_chunk(self):
-        from modules import isolated_translator
         # Mock translator
-        mock_translator = MagicMock()
+        mock_translator = Mock(spec=TRANSLATOR_SPEC)
         mock_translator.translate.return_value = ["Hola", "Mundo"]
 
         batch = ["Hello", "World"]
@@ -34,7 +45,6 @@ class TestIsolatedTranslator(unittest.TestCase):
 
     @patch("sys.exit")
     def test_main(self, mock_exit):
-        from modules import isolated_translator
 
         # Simulate exit stopping execution
         mock_exit.side_effect = SystemExit
@@ -51,36 +61,31 @@ class TestIsolatedTranslator(unittest.TestCase):
             mock_exit.assert_called_with(0)
 
     @patch("modules.isolated_translator._process_single_job")
-    @patch("modules.isolated_translator.ModelManager")
     @patch("modules.isolated_translator.config.load_config")
     @patch("modules.isolated_translator.OPTIMIZER")
     @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data='{"jobs": [{"lang": "es"}]}')
-    def test_run_batch_translation_worker(self, mock_open, mock_opt, mock_load, mock_mm, mock_proc):
-        from modules import isolated_translator
-        isolated_translator.run_batch_translation_worker("manifest.json")
+    def test_run_batch_translation_worker(self, mock_open, mock_opt, mock_load, mock_proc):
+        with patch("modules.isolated_translator.ModelManager", return_value=self.mm):
+            isolated_translator.run_batch_translation_worker("manifest.json")
         mock_proc.assert_called()
         self.assertEqual(mock_proc.call_count, 1)
+        self.assertIs(mock_proc.call_args.args[-1], self.mm.get_nllb.return_value)
 
     @patch("modules.isolated_translator.utils.print_progress_bar")
     @patch("modules.isolated_translator.time.sleep")
-    @patch("os.rename")
-    @patch("os.remove")
-    @patch("os.path.exists")
-    def test_process_single_job(self, mock_exists, mock_remove, mock_rename, mock_sleep, mock_print):
-        from modules import isolated_translator
+    @patch.multiple("os.path", exists=DEFAULT)
+    @patch.multiple("os", remove=DEFAULT, rename=DEFAULT)
+    def test_process_single_job(self, mock_sleep, mock_print, remove, rename, exists):
+        # output_file never exists, so the remove branch and the sync wait loop are both skipped
+        exists.return_value = False
 
         # Mock translator
-        mock_translator = MagicMock()
+        mock_translator = Mock(spec=TRANSLATOR_SPEC)
         mock_translator.translate.return_value = ["Translated Text"]
 
         # Mock file I/O
-        input_data = [{"text": "Source", "start": 0, "end": 1}]
-        m_open = mock_open(read_data=json.dumps(input_data))
-
-        # Files:
-        # 1. output_file exists? -> False (for remove check)
-        # 2. output_file exists? -> False (for sync wait loop exit)
-        mock_exists.return_value = False
+        handle = _JSON_MOPEN.return_value
+        handle.read.return_value = _INPUT_DATA_JSON
 
         job = {
             "lang": "es",
@@ -90,42 +95,41 @@ class TestIsolatedTranslator(unittest.TestCase):
             "src_code": "eng_Latn"
         }
 
-        with patch("builtins.open", m_open):
+        with patch("builtins.open", _JSON_MOPEN):
             isolated_translator._process_single_job(job, 0, 1, mock_translator)
 
         mock_translator.translate.assert_called()
-        mock_rename.assert_called()
-        # Verify file write to satisfy unused variable lint
-        m_open().write.assert_called()
+        rename.assert_called()
+        remove.assert_not_called()
+        # Verify the translated output was written
+        handle.write.assert_called()
 
-    @patch("modules.isolated_translator.ModelManager")
     @patch("modules.isolated_translator.config.load_config")
     @patch("modules.isolated_translator.OPTIMIZER")
     @patch("modules.utils.print_progress_bar")
     @patch("modules.isolated_translator.log")
-    def test_run_translation_worker_direct(self, mock_log, mock_print, mock_opt, mock_load, mock_mm):
-        from modules import isolated_translator
+    def test_run_translation_worker_direct(self, mock_log, mock_print, mock_opt, mock_load):
 
         # Mocking data
-        mock_translator = MagicMock()
+        mock_translator = Mock(spec=TRANSLATOR_SPEC)
         mock_translator.translate.return_value = ["Translated"]
-        mock_mm.return_value.get_nllb.return_value = mock_translator
+        self.mm.get_nllb.return_value = mock_translator
 
-        input_data = [{"text": "Hello", "start": 0.0, "end": 1.0}]
-        m_open = mock_open(read_data=json.dumps(input_data))
+        handle = _JSON_MOPEN.return_value
+        handle.read.return_value = _INPUT_DATA_JSON
 
-        with patch("builtins.open", m_open):
+        with patch("builtins.open", _JSON_MOPEN), \
+                patch("modules.isolated_translator.ModelManager", return_value=self.mm):
             isolated_translator.run_translation_worker(
                 "in.json", "out.json", "eng_Latn", "spa_Latn", 1, "Spanish", " [Prefix]"
             )
 
         mock_translator.translate.assert_called()
         # Verify it validates the write
-        m_open().write.assert_called()
+        handle.write.assert_called()
 
     @patch("sys.exit")
     def test_main_legacy_mode(self, mock_exit):
-        from modules import isolated_translator
 
         # Simulate legacy CLI args
         # input output src tgt batch label
@@ -146,7 +150,3 @@ class TestIsolatedTranslator(unittest.TestCase):
             # Should NOT exit strict 0 in legacy mode (it falls through or implicit return)
             # But main() doesn't have sys.exit(0) at end of legacy block?
             # Let's check code. It just finishes.
-
-
-if __name__ == "__main__":
-    unittest.main()
@@ -1,46 +1,55 @@
 import unittest
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import Mock, patch, mock_open
 import os
-import sys
+import itertools
 import json
+import time
+from types import MappingProxyType
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+from modules import config, translation, utils
+from tests.fakes import PROC_SPEC, SwapMixin
 
+# Shared, read-only TARGET_LANGUAGES fixtures; tests never mutate them
+_LANGS_ES = MappingProxyType({"es": {"code": "spa", "label": "Esp"}})
+_LANGS_ES_FULL = MappingProxyType({"es": {"code": "spa_Latn", "label": "Spanish"}})
+_LANGS_EN_ES = MappingProxyType({
+    "en": {"code": "eng_Latn", "label": "English"},
+    "es": {"code": "spa_Latn", "label": "Spanish"}
+})
 
-class TestTranslation(unittest.TestCase):
+# One open() double for the module; tests set the JSON payload, setUp clears it and the call history
+_JSON_MOPEN = mock_open()
+
+
+class TestTranslation(SwapMixin, unittest.TestCase):
     def setUp(self):
-        global translation, config, utils
-        from modules import translation, config, utils
-        config.TARGET_LANGUAGES = {"es": {"code": "spa_Latn", "label": "Spanish"}}
-
-    @patch("modules.translation.utils.register_subprocess")
-    @patch("modules.translation.utils.unregister_subprocess")
-    @patch("modules.translation.utils.save_translated_srt")
-    @patch("subprocess.Popen")
-    @patch("os.path.exists")
-    @patch("os.remove")
-    def test_handle_pivot_pass_success(self, mock_remove, mock_exists, mock_popen, mock_save_srt, mock_unreg, mock_reg):
-        mock_proc = MagicMock()
+        self._swap(config, "TARGET_LANGUAGES", _LANGS_ES_FULL)
+        # Clear call history and the previous test's payload; None is mock_open's "serve read_data" default
+        _JSON_MOPEN.reset_mock()
+        _JSON_MOPEN.return_value.read.return_value = None
+
+    def test_handle_pivot_pass_success(self):
+        self._swap(utils, "register_subprocess", lambda proc: None)
+        self._swap(utils, "unregister_subprocess", lambda proc: None)
+        mock_save_srt = self._swap(utils, "save_translated_srt", Mock())
+        mock_popen = self._swap(translation.subprocess, "Popen", Mock())
+        self._swap(os.path, "exists", lambda path: True)
+        self._swap(os, "remove", lambda path: None)
+
+        mock_proc = Mock(spec=PROC_SPEC)
         mock_proc.wait.return_value = 0
         mock_proc.returncode = 0
         mock_proc.poll.return_value = 0
         mock_popen.return_value = mock_proc
-        mock_exists.return_value = True
 
         # Ensure TARGET_LANGUAGES has "en" for pivot pass
-        config.TARGET_LANGUAGES = {
-            "en": {"code": "eng_Latn", "label": "English"},
-            "es": {"code": "spa_Latn", "label": "Spanish"}
-        }
+        config.TARGET_LANGUAGES = _LANGS_EN_ES
 
         source_data = [{"text": "Hello", "start": 0, "end": 1}]
         # Data for json.load
-        m_open = mock_open(read_data='["Hello Translated"]')
+        _JSON_MOPEN.return_value.read.return_value = '["Hello Translated"]'
 
-        with patch("builtins.open", m_open):
+        with patch("builtins.open", _JSON_MOPEN):
             new_data, new_code = translation._handle_pivot_pass(
                 source_data, "es", "folder", "base", ["en"], "spa_Latn", []
             )
@@ -49,64 +58,45 @@ class TestTranslation(unittest.TestCase):
             self.assertEqual(new_data[0]["text"], "Hello Translated")
             mock_save_srt.assert_called()
 
-    @patch("modules.translation.utils.validate_srt", return_value=False)
-    @patch("os.path.exists", return_value=True)
-    def test_identify_missing_targets_invalid_srt(self, mock_exists, mock_validate):
-        config.TARGET_LANGUAGES = {"es": {"code": "spa", "label": "Esp"}}
+    def test_identify_missing_targets_invalid_srt(self):
+        self._swap(utils, "validate_srt", lambda path: False)
+        self._swap(os.path, "exists", lambda path: True)
+        config.TARGET_LANGUAGES = _LANGS_ES
         missing, skipped = translation._identify_missing_targets("en", "folder", "base")
         self.assertEqual(len(missing), 1)
         self.assertEqual(skipped, 0)
 
-    @patch("modules.translation.utils.validate_srt", return_value=True)
-    @patch("os.path.exists", return_value=True)
-    def test_identify_missing_targets_skipped(self, mock_exists, mock_validate):
-        config.TARGET_LANGUAGES = {"es": {"code": "spa", "label": "Esp"}}
+    def test_identify_missing_targets_skipped(self):
+        self._swap(utils, "validate_srt", lambda path: True)
+        self._swap(os.path, "exists", lambda path: True)
+        config.TARGET_LANGUAGES = _LANGS_ES
         missing, skipped = translation._identify_missing_targets("en", "folder", "base")
         self.assertEqual(len(missing), 0)
         self.assertEqual(skipped, 1)
 
-    @patch("modules.translation.subprocess.Popen")
-    @patch("modules.translation.utils.save_translated_srt")
-    @patch("os.path.exists")
-    @patch("os.remove")
-    @patch("time.sleep")
-    def test_translate_segments_worker_flow(self, mock_sleep, mock_remove, mock_exists, mock_save, mock_popen):
+    def test_translate_segments_worker_flow(self):
+        mock_popen = self._swap(translation.subprocess, "Popen", Mock())
+        mock_save = self._swap(utils, "save_translated_srt", Mock())
+        self._swap(os, "remove", lambda path: None)
+        self._swap(time, "sleep", lambda secs: None)
         # Test the orchestrator: translate_segments -> _execute_translation_workers
 
         # Mock process
-        mock_proc = MagicMock()
-
-        # Dynamic side effect for poll: None (running) -> None -> 0 (finished)
-        def poll_se():
-            poll_se.counter += 1
-            if poll_se.counter > 3:
-                return 0
-            return None
-        poll_se.counter = 0
-        mock_proc.poll.side_effect = poll_se
+        mock_proc = Mock(spec=PROC_SPEC)
+
+        # Worker runs for three polls, then reports finished (and stays finished for cleanup)
+        mock_proc.poll.side_effect = itertools.chain(itertools.repeat(None, 3), itertools.repeat(0))
         mock_proc.wait.return_value = 0
         mock_popen.return_value = mock_proc
 
         # Mock segments
-        seg1 = MagicMock()
-        seg1.text = "Hello"
-        seg1.start = 0.0
-        seg1.end = 1.0
+        seg1 = Mock(text="Hello", start=0.0, end=1.0)
         segments = [seg1]
 
-        # Mock file existence:
-        # First calls (checking inputs/manifests) -> True or False
-        # Loop calls (checking outputs) -> True eventually
-        def exists_side_effect(path):
-            if "temp_output" in path:
-                # Simulate file appearing after some polls
-                if poll_se.counter >= 2:
-                    return True
-                return False
-            # Default to True for other files (like common input) or False if checking target existence check
-            return False
-
-        mock_exists.side_effect = exists_side_effect
+        # Only the worker's temp output ever "exists": absent at manifest time and on the
+        # first poll, then present when picked up and when cleaned up afterwards
+        outputs = iter([False, False, True, True])
+        self._swap(os.path, "exists", lambda path: "temp_output" in path and next(outputs, False))
 
         # Mock reading the output file
         # We need mock_open to handle read of JSON correctly
@@ -114,18 +104,14 @@ class TestTranslation(unittest.TestCase):
         fake_translation = [{"text": "Hola", "start": 0.0, "end": 1.0}]
         fake_json = json.dumps(fake_translation)
 
-        m_open = mock_open(read_data=fake_json)
+        _JSON_MOPEN.return_value.read.return_value = fake_json
 
-        with patch("builtins.open", m_open):
+        with patch("builtins.open", _JSON_MOPEN):
             translation.translate_segments(
-                segments, "en", MagicMock(), "folder", "base"
+                segments, "en", Mock(), "folder", "base"
             )
 
         # Should have called Popen (worker start)
         mock_popen.assert_called()
         # Should have saved SRT (because output file "appeared")
         mock_save.assert_called()
-
-
-if __name__ == "__main__":
-    unittest.main()
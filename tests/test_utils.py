@@ -1,21 +1,16 @@
-import unittest
-from unittest.mock import MagicMock, patch, mock_open
 import os
-import sys
+import signal
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, call, patch, mock_open
 
-# Ensure modules can be imported
-_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if _root not in sys.path:
-    sys.path.insert(0, _root)
+from modules import utils
+from tests.fakes import PROC_SPEC
 
 # Avoid global sys.modules hacks. conftest.py handles these.
 
 
 class TestUtils(unittest.TestCase):
-    def setUp(self):
-        global utils
-        from modules import utils
-
     @patch("os.path.getsize", return_value=100)
     @patch("os.path.exists", return_value=True)
     def test_validate_srt_valid(self, mock_exists, mock_size):
@@ -45,15 +40,16 @@ class TestUtils(unittest.TestCase):
     @patch("os.replace")
     @patch("os.remove")
     def test_save_srt(self, mock_remove, mock_replace):
-        segments = [MagicMock(start=0, end=1.5, text="Hello")]
+        segments = [Mock(start=0, end=1.5, text="Hello")]
         with patch("builtins.open", mock_open()) as m:
             utils.save_srt(segments, "test.srt")
             m.assert_called_with("test.srt.tmp", "w", encoding="utf-8")
+            m().write.assert_called_once_with("1\n00:00:00,000 --> 00:00:01,500\nHello\n\n")
 
     @patch("os.replace")
     @patch("os.remove")
     def test_save_translated_srt(self, mock_remove, mock_replace):
-        segments = [MagicMock(start=0, end=1.5)]
+        segments = [Mock(start=0, end=1.5)]
         translations = ["Hola"]
         with patch("builtins.open", mock_open()) as m:
             utils.save_translated_srt(segments, translations, "test_es.srt")
@@ -91,8 +87,8 @@ class TestUtils(unittest.TestCase):
     @patch("os.name", "nt")
     def test_init_console_windows(self):
         # Mock ctypes via sys.modules because it's imported LOCALLY
-        mock_ctypes = MagicMock()
-        mock_kernel32 = MagicMock()
+        mock_ctypes = MagicMock()  # init_console ORs flags into ctypes values
+        mock_kernel32 = Mock()
         mock_ctypes.windll.kernel32 = mock_kernel32
         mock_kernel32.GetStdHandle.return_value = 123
         # GetConsoleMode needs to return non-zero (True)
@@ -104,28 +100,44 @@ class TestUtils(unittest.TestCase):
 
         mock_kernel32.SetConsoleMode.assert_called()
 
-    @patch("modules.utils.active_subprocesses", new_callable=list)
     @patch("sys.exit")
     @patch("sys.platform", "win32")
     @patch("subprocess.call")
-    def test_handle_shutdown(self, mock_call, mock_exit, mock_procs):
-        # Mock a running process
-        proc = MagicMock()
-        proc.poll.return_value = None  # Running
-        proc.pid = 1234
-        mock_procs.append(proc)
-
-        # Inject global list into utils (since it's imported)
-        with patch("modules.utils.active_subprocesses", mock_procs):
-            utils.handle_shutdown(None, None)
-
-        proc.terminate.assert_called()
-        mock_call.assert_called()  # taskkill on windows
+    def test_handle_shutdown(self, mock_call, mock_exit):
+        # Two running processes, one finished one
+        procs = [Mock(spec=PROC_SPEC, pid=pid) for pid in (1234, 5678, 9999)]
+        for proc in procs:
+            proc.poll.return_value = None  # Running
+        procs[2].poll.return_value = 0
+
+        utils.handle_shutdown(None, None, procs=procs)
+
+        # One taskkill for every running tree on windows
+        mock_call.assert_called_once()
+        self.assertEqual(mock_call.call_args.args[0], ["taskkill", "/F", "/T", "/PID", "1234", "/PID", "5678"])
+        mock_exit.assert_called_with(0)
+
+    @patch("sys.exit")
+    @patch("sys.platform", "linux")
+    @patch("os.killpg", create=True)
+    def test_handle_shutdown_posix(self, mock_killpg, mock_exit):
+        # Exits on SIGTERM: running when collected, gone by the grace check
+        proc = Mock(spec=PROC_SPEC, pid=1234)
+        proc.poll.side_effect = [None, 0, 0]
+        # Ignores SIGTERM, so its group gets SIGKILL
+        stubborn = Mock(spec=PROC_SPEC, pid=5678)
+        stubborn.poll.return_value = None
+
+        utils.handle_shutdown(None, None, procs=[proc, stubborn], grace=0)
+
+        self.assertEqual(mock_killpg.call_args_list, [
+            call(1234, signal.SIGTERM), call(5678, signal.SIGTERM), call(5678, signal.SIGKILL)
+        ])
         mock_exit.assert_called_with(0)
 
     def test_print_banner(self):
         # Tests lines 20-78
-        mock_opt = MagicMock()
+        mock_opt = Mock()
         mock_opt.gpu_name = "TestGPU"
         mock_opt.vram_gb = 12
         mock_opt.profile = "ULTRA"
@@ -146,7 +158,7 @@ class TestUtils(unittest.TestCase):
     def test_get_cpu_name_windows(self):
         # Tests lines 483-495 (Windows Registry)
         # Mock winreg module being available
-        mock_winreg = MagicMock()
+        mock_winreg = Mock()
         mock_winreg.QueryValueEx.return_value = ["Intel Mock CPU", 1]
 
         with patch.dict("sys.modules", {"winreg": mock_winreg}):
@@ -155,22 +167,28 @@ class TestUtils(unittest.TestCase):
                 self.assertEqual(name, "Intel Mock CPU")
 
     def test_run_ffmpeg_progress_logic(self):
-        # Test the parsing logic of run_ffmpeg_progress
-        mock_proc = MagicMock()
-        mock_proc.poll.return_value = 0  # Always done, but loop continues until readline is empty
+        # Test the `-progress pipe:1` parsing of run_ffmpeg_progress
+        mock_proc = Mock(spec=PROC_SPEC)
         mock_proc.returncode = 0
-        mock_proc.stderr.readline.side_effect = [
-            "frame= 100 fps= 25 q=-1.0 size= 100kB time=00:00:01.00 bitrate= 100kbits/s speed=1.0x\n",
-            "frame= 200 fps= 25 q=-1.0 size= 200kB time=00:00:02.00 bitrate= 100kbits/s speed=1.0x\n",
+        mock_proc.stdout.readline.side_effect = [
+            "out_time_us=N/A\n",
+            "out_time_us=1000000\n",
+            "progress=continue\n",
+            "out_time_us=2000000\n",
+            "progress=end\n",
             ""
         ]
 
-        with patch("subprocess.Popen", return_value=mock_proc), \
+        with patch("subprocess.Popen", return_value=mock_proc) as m_popen, \
                 patch("modules.utils.register_subprocess"), \
                 patch("modules.utils.print_progress_bar") as m_bar:
 
-            utils.run_ffmpeg_progress(["ffmpeg", "-ver"], "Processing", total_duration=4.0)
-            self.assertTrue(m_bar.call_count >= 2)
+            utils.run_ffmpeg_progress(["ffmpeg", "-i", "in.mp4", "out.wav"], "Processing", total_duration=4.0)
+
+        self.assertEqual(m_popen.call_args.args[0], ["ffmpeg", "-progress", "pipe:1", "-nostats", "-i", "in.mp4", "out.wav"])
+        # Two progress updates, then the final 100% bar
+        self.assertEqual([c.args[:2] for c in m_bar.call_args_list], [(1.0, 4.0), (2.0, 4.0), (4.0, 4.0)])
+        mock_proc.wait.assert_called_once()
 
     def test_extract_clean_audio(self):
         # Test extract_clean_audio success path
@@ -185,36 +203,15 @@ class TestUtils(unittest.TestCase):
             self.assertTrue(res.endswith("_temp.wav"))
 
     def test_save_and_parse_srt(self):
-        # Test save_srt and then parse_srt
+        # Round-trip through a real temp dir: save_srt's atomic replace, then parse_srt's validate + read
         from modules.models import Segment
-        segs = [Segment(0.0, 1.0, "Hello"), Segment(1.0, 2.5, "World")]
-
-        # We need to use a real temporary file to test read/write cleanly,
-        # or use mock_open if we are careful. mock_open is harder for read back what we wrote.
-        # Let's use mock_open for write, and a separate mock_open for read?
-        # Actually parse_srt reads.
-
-        # Test SAVE
-        m_open = mock_open()
-        with patch("builtins.open", m_open), patch("os.replace"):
-            utils.save_srt(segs, "out.srt")
-            # Verify write content
-            handle = m_open()
-            handle.write.assert_called()
-            written = "".join(call.args[0] for call in handle.write.call_args_list)
-            self.assertIn("00:00:00,000 --> 00:00:01,000", written)
-            self.assertIn("Hello", written)
-
-        # Test PARSE
-        fake_srt = "1\n00:00:00,000 --> 00:00:01,000\nHello\n\n2\n00:00:01,000 --> 00:00:02,500\nWorld"
-        with patch("builtins.open", mock_open(read_data=fake_srt)), \
-                patch("os.path.exists", return_value=True), \
-                patch("os.path.getsize", return_value=100):
-            parsed = utils.parse_srt("out.srt")
-            self.assertEqual(len(parsed), 2)
-            self.assertEqual(parsed[0].text, "Hello")
-            self.assertEqual(parsed[1].end, 2.5)
-
-
-if __name__ == "__main__":
-    unittest.main()
+        segs = [Segment(1.0, 2.5, "World"), Segment(0.0, 1.0, "Hello")]  # save_srt must re-sort
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "out.srt")
+
+        utils.save_srt(segs, path)
+        self.assertEqual(os.listdir(tmp.name), ["out.srt"])  # no .tmp left behind
+
+        parsed = utils.parse_srt(path)
+        self.assertEqual([(s.start, s.end, s.text) for s in parsed], [(0.0, 1.0, "Hello"), (1.0, 2.5, "World")])
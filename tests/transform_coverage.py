@@ -1,13 +1,72 @@
-import xml.etree.ElementTree as ET
+import bisect
 import sys
 import os
 import datetime
+import statistics
+import string
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from radon.complexity import cc_visit  # type: ignore
+except ImportError:
+    cc_visit = None
+
+try:
+    import lxml.etree as etree  # type: ignore
+    # lxml filters by tag in C, so non-class elements never reach Python
+    _CLASS_ITERPARSE = {"tag": "class"}
+except ImportError:
+    import xml.etree.ElementTree as etree
+    _CLASS_ITERPARSE = {}
 
 # =============================================================================
 # BADGE GENERATION
 # =============================================================================
 
 
+# Coverage thresholds (descending) and their shields.io colors; anything lower is red
+_BADGE_COLORS = (
+    (95, "#4c1"),  # brightgreen
+    (90, "#97ca00"),  # green
+    (75, "#dfb317"),  # yellow
+    (50, "#fe7d37"),  # orange
+)
+_BADGE_RED = "#e05d44"
+
+_BADGE_TEMPLATE = string.Template(
+    """<svg xmlns="http://www.w3.org/2000/svg" width="${total_width}" height="20" role="img" """
+    """aria-label="${label_text}: ${value_text}">
+    <title>${label_text}: ${value_text}</title>
+    <linearGradient id="s" x2="0" y2="100%">
+        <stop offset="0" stop-color="#bbb" stop-opacity=".1"/>
+        <stop offset="1" stop-opacity=".1"/>
+    </linearGradient>
+    <clipPath id="r">
+        <rect width="${total_width}" height="20" rx="3" fill="#fff"/>
+    </clipPath>
+    <g clip-path="url(#r)">
+        <rect width="${label_width}" height="20" fill="#555"/>
+        <rect x="${label_width}" width="${value_width}" height="20" fill="${color}"/>
+        <rect width="${total_width}" height="20" fill="url(#s)"/>
+    </g>
+    <g fill="#fff" text-anchor="middle"
+       font-family="Verdana,Geneva,DejaVu Sans,sans-serif"
+       text-rendering="geometricPrecision" font-size="110">
+        <text aria-hidden="true" x="${label_x}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" """
+    """textLength="${label_length}">${label_text}</text>
+        <text x="${label_x}" y="140" transform="scale(.1)" fill="#fff" textLength="${label_length}">${label_text}</text>
+        <text aria-hidden="true" x="${value_x}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" """
+    """textLength="${value_length}">${label_text}</text>
+        <text x="${value_x}" y="140" transform="scale(.1)" fill="#fff" textLength="${value_length}">"""
+    """${value_text}</text>
+    </g>
+</svg>"""
+)
+
+# Badge directories already ensured by this process
+_BADGE_DIRS = set()
+
+
 def generate_badge(line_rate, output_path="assets/badge.svg"):
     """Generates a coverage badge SVG."""
     try:
@@ -15,15 +74,7 @@ def generate_badge(line_rate, output_path="assets/badge.svg"):
     except ValueError:
         coverage = 0.0
 
-    color = "#e05d44"  # red
-    if coverage >= 95:
-        color = "#4c1"  # brightgreen
-    elif coverage >= 90:
-        color = "#97ca00"  # green
-    elif coverage >= 75:
-        color = "#dfb317"  # yellow
-    elif coverage >= 50:
-        color = "#fe7d37"  # orange
+    color = next((c for threshold, c in _BADGE_COLORS if coverage >= threshold), _BADGE_RED)
 
     coverage_str = f"{int(round(coverage))}%"
     label_text = "Coverage"
@@ -36,43 +87,35 @@ def generate_badge(line_rate, output_path="assets/badge.svg"):
 
     total_width = label_width + value_width
 
-    # Center positions
-    label_x = label_width / 2.0 * 10
-    value_x = (label_width + value_width / 2.0) * 10
-
-    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{total_width}" height="20" role="img" """ \
-        f"""aria-label="{label_text}: {value_text}">
-    <title>{label_text}: {value_text}</title>
-    <linearGradient id="s" x2="0" y2="100%">
-        <stop offset="0" stop-color="#bbb" stop-opacity=".1"/>
-        <stop offset="1" stop-opacity=".1"/>
-    </linearGradient>
-    <clipPath id="r">
-        <rect width="{total_width}" height="20" rx="3" fill="#fff"/>
-    </clipPath>
-    <g clip-path="url(#r)">
-        <rect width="{label_width}" height="20" fill="#555"/>
-        <rect x="{label_width}" width="{value_width}" height="20" fill="{color}"/>
-        <rect width="{total_width}" height="20" fill="url(#s)"/>
-    </g>
-    <g fill="#fff" text-anchor="middle"
-       font-family="Verdana,Geneva,DejaVu Sans,sans-serif"
-       text-rendering="geometricPrecision" font-size="110">
-        <text aria-hidden="true" x="{int(label_x)}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" """ \
-        f"""textLength="{label_width*10 - 100}">{label_text}</text>
-        <text x="{int(label_x)}" y="140" transform="scale(.1)" fill="#fff" textLength="{label_width*10 - 100}">{label_text}</text>
-        <text aria-hidden="true" x="{int(value_x)}" y="150" fill="#010101" fill-opacity=".3" transform="scale(.1)" """ \
-        f"""textLength="{value_width*10 - 100}">{label_text}</text>
-        <text x="{int(value_x)}" y="140" transform="scale(.1)" fill="#fff" textLength="{value_width*10 - 100}">""" \
-        f"""{value_text}</text>
-    </g>
-</svg>"""
-
-    if not os.path.exists(os.path.dirname(output_path)):
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(svg)
+    svg = _BADGE_TEMPLATE.substitute(
+        total_width=total_width,
+        label_width=label_width,
+        value_width=value_width,
+        color=color,
+        label_text=label_text,
+        value_text=value_text,
+        # Center positions and text lengths, in the 10x units of the scale(.1) transform
+        label_x=int(label_width / 2.0 * 10),
+        value_x=int((label_width + value_width / 2.0) * 10),
+        label_length=label_width * 10 - 100,
+        value_length=value_width * 10 - 100,
+    )
+
+    out_dir = os.path.dirname(output_path)
+    if out_dir and out_dir not in _BADGE_DIRS:
+        os.makedirs(out_dir, exist_ok=True)
+        _BADGE_DIRS.add(out_dir)
+
+    if svg.isascii():
+        # Every substituted field is numeric or a fixed string, so skip the text/codec layers
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, svg.encode("ascii"))
+        finally:
+            os.close(fd)
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(svg)
     print(f"Generated badge: {output_path} ({coverage_str})")
 
 # =============================================================================
@@ -80,67 +123,102 @@ def generate_badge(line_rate, output_path="assets/badge.svg"):
 # =============================================================================
 
 
-def _get_complexity_color(complexity):
-    """Returns a color hex code based on cyclomatic complexity."""
-    if complexity <= 5:
-        return "brightgreen"
-    if complexity <= 10:
-        return "yellowgreen"
-    if complexity <= 20:
-        return "yellow"
-    if complexity <= 30:
-        return "orange"
-    return "red"
+# Inclusive upper complexity bounds for each color in _COLOR_TABLE; anything above the last is red
+_COLOR_BOUNDS = (5, 10, 20, 30)
+_COLOR_TABLE = ("brightgreen", "yellowgreen", "yellow", "orange", "red")
+_COMPLEXITY_BADGE_URL = "https://img.shields.io/badge/complexity-"
+
+
+def _color_idx(complexity):
+    """Returns the _COLOR_TABLE index for a cyclomatic complexity."""
+    return bisect.bisect_left(_COLOR_BOUNDS, complexity)
+
+
+# Sources larger than this (generated code, vendored bundles) get a size estimate instead of a radon parse
+MAX_COMPLEXITY_BYTES = 512 * 1024
 
 
 def _calculate_file_complexity(file_path):
     """Calculates the average cyclomatic complexity for a file."""
+    if cc_visit is None:
+        return 0
     try:
-        from radon.complexity import cc_visit  # type: ignore
         if not os.path.exists(file_path):
             return 0
-        with open(file_path, 'r', encoding='utf-8') as f:
+        size = os.path.getsize(file_path)
+        if size > MAX_COMPLEXITY_BYTES:
+            return max(1, size // 4096)
+        with open(file_path, 'rb') as f:
             code = f.read()
-        blocks = cc_visit(code)
+        blocks = cc_visit(code.decode('utf-8', errors='replace'))
         if not blocks:
             return 1
-        return sum(b.complexity for b in blocks) // len(blocks)
+        return int(statistics.fmean(b.complexity for b in blocks))
     except Exception:
         return 0
 
 
+# Below this many files, process start-up costs more than the parsing it spreads out
+_PARALLEL_MIN_FILES = 8
+
+
+def _calculate_complexities(filenames):
+    """Returns {filename: complexity}, parsing each distinct file once (in parallel for large reports)."""
+    if cc_visit is None:
+        return {}
+    files = sorted(set(filenames))
+    if len(files) < _PARALLEL_MIN_FILES:
+        return {f: _calculate_file_complexity(f) for f in files}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return dict(zip(files, executor.map(_calculate_file_complexity, files, chunksize=4)))
+
+
 def _generate_markdown_summary(root, output_path="coverage_summary.md"):
     """Generates a markdown summary from the XML root."""
     total_coverage = int(float(root.get('line-rate', 0)) * 100)
-    summary = "# Coverage and Complexity Report\n\n"
-    summary += f"**Total Project Coverage: {total_coverage}%**\n\n"
-    summary += f"**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    summary += "## File Breakdown\n\n"
-    summary += "| File | Coverage | Complexity |\n"
-    summary += "| :--- | :---: | :---: |\n"
-
+    parts = [
+        "# Coverage and Complexity Report\n\n",
+        f"**Total Project Coverage: {total_coverage}%**\n\n",
+        f"**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+        "## File Breakdown\n\n",
+        "| File | Coverage | Complexity |\n",
+        "| :--- | :---: | :---: |\n",
+    ]
+
+    # The first class of each package stands in for its complexity
+    packages = []
     for pkg in root.findall('.//package'):
+        cls = pkg.find('.//class')
+        packages.append((pkg, cls.get('filename') if cls is not None else None))
+    # Only existing Python sources are worth handing to radon; everything else scores 0
+    complexities = _calculate_complexities(
+        filename for _, filename in packages
+        if filename and filename.endswith('.py') and os.path.exists(filename)
+    )
+
+    for pkg, filename in packages:
         pkg_name = pkg.get('name')
         l_rate = float(pkg.get('line-rate', 0)) * 100
 
-        # Try to find a class file to calculate complexity
-        complexity = 0
-        cls = pkg.find('.//class')
-        if cls is not None:
-            complexity = _calculate_file_complexity(cls.get('filename'))
+        complexity = complexities.get(filename, 0)
 
-        comp_color = _get_complexity_color(complexity)
-        comp_badge = (
-            f"![{complexity}](https://img.shields.io/badge/"
-            f"complexity-{complexity}-{comp_color})"
+        parts.append(
+            f"| {pkg_name} | {int(l_rate)}% | "
+            f"![{complexity}]({_COMPLEXITY_BADGE_URL}{complexity}-{_COLOR_TABLE[_color_idx(complexity)]}) |\n"
         )
-        summary += f"| {pkg_name} | {int(l_rate)}% | {comp_badge} |\n"
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(summary)
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        f.write("".join(parts))
     print(f"Generated summary: {output_path}")
 
 
+def _collect_classes(xml_file):
+    """Parses xml_file in one streaming pass, returning its root and every <class> element."""
+    context = etree.iterparse(xml_file, events=('end',), **_CLASS_ITERPARSE)
+    all_classes = [elem for _, elem in context if elem.tag == 'class']
+    return context.root, all_classes
+
+
 def transform_coverage(xml_file):
     """Transforms cobertura.xml by splitting classes into packages and generating reports."""
     if not os.path.exists(xml_file):
@@ -148,11 +226,10 @@ def transform_coverage(xml_file):
         sys.exit(1)
 
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
+        root, all_classes = _collect_classes(xml_file)
         line_rate = root.get("line-rate", "0")
         generate_badge(line_rate)
-    except ET.ParseError as e:
+    except etree.ParseError as e:
         print(f"Error parsing XML: {e}")
         sys.exit(1)
 
@@ -161,13 +238,6 @@ def transform_coverage(xml_file):
         _generate_markdown_summary(root)
         return
 
-    # Collect all classes from all existing packages
-    all_classes = []
-    for pkg in packages_el.findall('package'):
-        classes_el = pkg.find('classes')
-        if classes_el is not None:
-            all_classes.extend(classes_el.findall('class'))
-
     # Clear existing packages
     packages_el.clear()
 
@@ -176,16 +246,16 @@ def transform_coverage(xml_file):
         filename = cls.get('filename')
         pkg_name = filename
 
-        new_pkg = ET.SubElement(packages_el, 'package')
+        new_pkg = etree.SubElement(packages_el, 'package')
         new_pkg.set('name', pkg_name)
 
         for attr in ['line-rate', 'branch-rate', 'complexity']:
             new_pkg.set(attr, cls.get(attr) or '0.0')
 
-        new_classes = ET.SubElement(new_pkg, 'classes')
+        new_classes = etree.SubElement(new_pkg, 'classes')
         new_classes.append(cls)
 
-    tree.write(xml_file, encoding='UTF-8', xml_declaration=True)
+    etree.ElementTree(root).write(xml_file, encoding='UTF-8', xml_declaration=True)
     print(f"Successfully transformed {xml_file}: Split {len(all_classes)} classes into separate packages.")
     _generate_markdown_summary(root)
 